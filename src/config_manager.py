@@ -26,18 +26,49 @@ Handles JSON config at %APPDATA%\\ScreenPrompt\\config.json
 """
 
 import json
+import mmap
 import os
+import re
+import tempfile
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping, TypedDict
+
+# Optional: orjson parses/serializes straight from/to UTF-8 bytes
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 # Config paths
 CONFIG_DIR = Path(os.environ.get("APPDATA", "")) / "ScreenPrompt"
 CONFIG_FILE = CONFIG_DIR / "config.json"
 
+class Config(TypedDict):
+    """
+    Typed view of the config schema.
+    Purely static: at runtime a Config is the plain dict json produces.
+    """
+    x: int
+    y: int
+    width: int
+    height: int
+    opacity: float
+    font_family: str
+    font_size: int
+    font_color: str
+    bg_color: str
+    text: str
+    first_run_shown: bool
+    locked: bool
+    auto_check_updates: bool
+
+
 # Default configuration - CANONICAL SCHEMA
-# All modules MUST use these exact key names
-DEFAULT_CONFIG = {
+# All modules MUST use these exact key names. Read-only: use .copy() for a
+# mutable dict
+DEFAULT_CONFIG: Mapping[str, Any] = MappingProxyType({
     # Window position and size
     "x": 100,
     "y": 100,
@@ -55,35 +86,160 @@ DEFAULT_CONFIG = {
     "locked": False,  # Mouse pass-through mode
     # Updates
     "auto_check_updates": True,  # Check for updates on startup
+})
+
+# Configs larger than this are parsed from a read-only mmap (orjson only)
+# instead of being copied into a bytes object first
+MMAP_THRESHOLD = 64 * 1024
+
+# Anything bigger is not a config we wrote; fall back to defaults unparsed
+MAX_CONFIG_BYTES = 1 << 20
+
+# Lets load_config skip the defaults merge when a saved config is complete
+_DEFAULT_KEYS = frozenset(DEFAULT_CONFIG)
+
+# ((path, inode, mtime_ns, size), config) of the last parsed config file
+_load_cache: tuple[tuple, Config] | None = None
+
+# Color keys, validated as "#RRGGBB" before saving
+COLOR_KEYS = ("font_color", "bg_color")
+_HEX_COLOR_MATCH = re.compile(r"#[0-9A-Fa-f]{6}\Z").match
+
+# Numeric ranges enforced before saving (same limits as the settings UI)
+CONFIG_BOUNDS = {
+    "opacity": (0.5, 1.0),
+    "font_size": (8, 48),
 }
 
 
+def is_valid_hex_color(value: Any) -> bool:
+    """Return True if value is a "#RRGGBB" color string."""
+    return isinstance(value, str) and _HEX_COLOR_MATCH(value) is not None
+
+
+def _validate(config: dict[str, Any]) -> dict[str, Any]:
+    """
+    Return config with invalid values fixed, copying only if needed.
+    Malformed colors and non-numeric values fall back to their defaults;
+    out-of-range numbers are clamped into CONFIG_BOUNDS.
+    """
+    fixes: dict[str, Any] = {}
+    for key in COLOR_KEYS:
+        if key in config and not is_valid_hex_color(config[key]):
+            fixes[key] = DEFAULT_CONFIG[key]
+    for key, (low, high) in CONFIG_BOUNDS.items():
+        if key not in config:
+            continue
+        value = config[key]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            fixes[key] = DEFAULT_CONFIG[key]
+        elif not low <= value <= high:
+            fixes[key] = min(max(value, low), high)
+    return {**config, **fixes} if fixes else config
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse UTF-8 JSON bytes (orjson if installed)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(config: dict[str, Any]) -> bytes:
+    """Serialize config to compact UTF-8 JSON bytes (orjson if installed)."""
+    if orjson is not None:
+        return orjson.dumps(config)
+    return json.dumps(config, separators=(",", ":")).encode("utf-8")
+
+
 def get_config_path() -> Path:
     """Return path to config.json."""
     return CONFIG_FILE
 
 
-def load_config() -> dict[str, Any]:
+def get_config_mtime() -> int:
+    """
+    Return config.json modification time in nanoseconds (0 if missing).
+    Lets callers skip reloading when the file has not changed.
+    """
+    try:
+        return os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def load_config() -> Config:
     """
     Load configuration from JSON file.
-    Returns defaults merged with saved config to handle missing keys.
+    Returns defaults merged with saved config to handle missing keys;
+    keys outside the schema, non-object JSON and oversized files are ignored.
+    If the file is unchanged since the last load, the previous result is
+    reused without reading or parsing it again.
     """
-    if CONFIG_FILE.exists():
-        try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                saved = json.load(f)
-                # Merge with defaults for any missing keys
-                return {**DEFAULT_CONFIG, **saved}
-        except (json.JSONDecodeError, IOError):
-            pass
-    return DEFAULT_CONFIG.copy()
+    global _load_cache
+    # EAFP: a missing file surfaces as OSError from open(), no stat needed
+    try:
+        with open(CONFIG_FILE, "rb") as f:
+            st = os.fstat(f.fileno())
+            key = (str(CONFIG_FILE), st.st_ino, st.st_mtime_ns, st.st_size)
+            if _load_cache is not None and _load_cache[0] == key:
+                return _load_cache[1].copy()
+            if st.st_size > MAX_CONFIG_BYTES:
+                return DEFAULT_CONFIG.copy()
+
+            if orjson is not None and st.st_size > MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        saved = orjson.loads(view)
+            else:
+                saved = _json_loads(f.read())
+    except (json.JSONDecodeError, OSError):
+        return DEFAULT_CONFIG.copy()
+
+    if not isinstance(saved, dict):
+        return DEFAULT_CONFIG.copy()
+
+    # Exactly the schema's keys (the normal case) needs no merge
+    if saved.keys() == _DEFAULT_KEYS:
+        config = saved
+    else:
+        # Merge with defaults for missing keys; drop keys outside the schema
+        config = DEFAULT_CONFIG.copy()
+        config.update((k, v) for k, v in saved.items() if k in _DEFAULT_KEYS)
+
+    # Callers mutate what they get, so hand out copies of the cached dict
+    _load_cache = (key, config)
+    return config.copy()
 
 
 def save_config(config: dict[str, Any]) -> None:
-    """Save configuration to JSON file."""
+    """
+    Save configuration to JSON file.
+    Writes a temp file in the same directory and renames it over config.json,
+    so a crash mid-write never leaves a truncated config behind.
+    Invalid values are fixed up (see _validate) rather than written.
+    """
+    global _load_cache
+    config = _validate(config)
+    _load_cache = None
+
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=2)
+    data = memoryview(_json_dumps(config))
+    fd, tmp_path = tempfile.mkstemp(dir=CONFIG_DIR, prefix=".config-", suffix=".tmp")
+    try:
+        # Serialized up front, so one unbuffered write normally covers it all
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, CONFIG_FILE)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
 
 def is_first_run() -> bool:
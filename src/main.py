@@ -34,6 +34,7 @@ import sys
 import threading
 import tkinter as tk
 from tkinter import messagebox
+from tkinter import font as tkfont
 from typing import Optional
 
 try:
@@ -64,12 +65,16 @@ WS_EX_TOOLWINDOW = 0x00000080  # Hides from taskbar and Alt+Tab
 WH_MOUSE_LL = 14
 WM_MOUSEWHEEL = 0x020A
 
+# How often the UI samples download progress from the updater
+DOWNLOAD_POLL_MS = 50
+
 # Load user32.dll
 user32 = ctypes.windll.user32
-user32.GetWindowLongPtrW.restype = ctypes.c_void_p
+# LONG_PTR styles are signed ints; c_void_p would return None for 0
+user32.GetWindowLongPtrW.restype = ctypes.c_ssize_t
 user32.GetWindowLongPtrW.argtypes = [ctypes.c_void_p, ctypes.c_int]
-user32.SetWindowLongPtrW.restype = ctypes.c_void_p
-user32.SetWindowLongPtrW.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p]
+user32.SetWindowLongPtrW.restype = ctypes.c_ssize_t
+user32.SetWindowLongPtrW.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_ssize_t]
 
 # Mouse hook structure
 class MSLLHOOKSTRUCT(ctypes.Structure):
@@ -192,6 +197,7 @@ class ScreenPromptWindow:
         if is_first_run():
             self.show_ethical_notice()
             mark_first_run_complete()
+            self.config["first_run_shown"] = True  # Keep in-memory copy in sync
 
         self.setup_window()
         self.setup_widgets()
@@ -274,6 +280,16 @@ class ScreenPromptWindow:
                 ))
 
         updater.download_update_async(complete_callback=on_download_complete)
+        self.root.after(DOWNLOAD_POLL_MS, self._poll_download_progress)
+
+    def _poll_download_progress(self):
+        """Mirror the updater's download progress on the update button."""
+        updater = get_updater()
+        if not updater.is_downloading:
+            self._show_update_indicator()
+            return
+        self.update_btn.configure(text=f" \u2B07 {updater.download_progress:.0%} ")
+        self.root.after(DOWNLOAD_POLL_MS, self._poll_download_progress)
 
     def _launch_update_installer(self, installer_path: str):
         """Launch the update installer and close the app."""
@@ -529,16 +545,22 @@ class ScreenPromptWindow:
         # Store original text color for placeholder toggling
         self.text_color = self.config.get("font_color", "#ffffff")
 
+        # Named font shared by the text widget; font changes reconfigure it
+        # in place so Tk reuses one font object instead of creating new ones
+        self.text_font = tkfont.Font(
+            root=self.root,
+            name="overlayFont",
+            family=self.config.get("font_family", "Consolas"),
+            size=self.config.get("font_size", 11)
+        )
+
         # Text widget for prompt content
         self.text_widget = tk.Text(
             self.content_frame,
             bg=self.config.get("bg_color", "#2d2d2d"),
             fg=self.text_color,
             insertbackground="#ffffff",
-            font=(
-                self.config.get("font_family", "Consolas"),
-                self.config.get("font_size", 11)
-            ),
+            font=self.text_font,
             wrap=tk.WORD,
             borderwidth=0,
             highlightthickness=0,
@@ -567,7 +589,9 @@ class ScreenPromptWindow:
             on_text_color_change=self._apply_text_color,
             on_bg_color_change=self._apply_bg_color,
             on_save=self.on_settings_save,
-            on_cancel=self.on_settings_cancel
+            on_cancel=self.on_settings_cancel,
+            config=self.config,
+            on_restore=self._restore_appearance
         )
 
     def _bind_resize_edge(self, frame: tk.Frame, edge: str) -> None:
@@ -600,7 +624,7 @@ class ScreenPromptWindow:
 
     def _apply_font(self, family: str, size: int) -> None:
         """Apply font changes to text widget for real-time preview."""
-        self.text_widget.configure(font=(family, size))
+        self.text_font.configure(family=family, size=size)
 
     def _apply_text_color(self, hex_color: str) -> None:
         """Apply text color change to text widget for real-time preview."""
@@ -612,6 +636,18 @@ class ScreenPromptWindow:
         """Apply background color change to text widget for real-time preview."""
         self.text_widget.configure(bg=hex_color)
 
+    def _restore_appearance(self, values: dict) -> None:
+        """Restore opacity, font and colors in one pass (settings cancel)."""
+        self.root.attributes("-alpha", values["opacity"])
+        self.text_font.configure(
+            family=values["font_family"], size=values["font_size"]
+        )
+        self.text_color = values["font_color"]
+        if self.placeholder_active:
+            self.text_widget.configure(bg=values["bg_color"])
+        else:
+            self.text_widget.configure(bg=values["bg_color"], fg=self.text_color)
+
     def _show_placeholder(self) -> None:
         """Show placeholder text in the text widget."""
         self.text_widget.delete("1.0", tk.END)
@@ -665,7 +701,7 @@ class ScreenPromptWindow:
         """Set font size and save to config."""
         self.config["font_size"] = size
         family = self.config.get("font_family", "Consolas")
-        self.text_widget.configure(font=(family, size))
+        self.text_font.configure(family=family, size=size)
         save_config(self.config)
 
     def _toggle_lock(self) -> None:
@@ -1056,8 +1092,7 @@ class ScreenPromptWindow:
         self._run_in_main_thread(clear)
 
     def on_settings_save(self):
-        """Handle settings save - reload config and show text."""
-        self.config = load_config()
+        """Handle settings save - show text (the panel updated self.config)."""
         self.text_widget.pack(fill=tk.BOTH, expand=True, padx=2, pady=(0, 2))
 
     def on_settings_cancel(self):
@@ -28,17 +28,28 @@
 Settings panel for ScreenPrompt overlay.
 Embedded as Frame inside main window to avoid browser black box issue.
 Provides opacity slider, font selection, and color pickers with real-time preview.
+
+Hosts should render text with one named font and update it in place from
+on_font_change, so Tk reuses the same font object across previews:
+
+    text_font = tkfont.Font(name="overlayFont", family=family, size=size)
+    text = tk.Text(parent, font=text_font)
+    on_font_change = lambda family, size: text_font.configure(family=family, size=size)
 """
 
 import ctypes
+import functools
+import json
+import os
 import sys
 import tkinter as tk
+import weakref
 import webbrowser
 from tkinter import ttk
 from tkinter import font as tkfont
 from typing import Callable, Optional
 
-from config_manager import load_config, save_config
+from config_manager import CONFIG_DIR, get_config_mtime, load_config, save_config
 
 # Color palettes for swatches
 TEXT_COLORS = [
@@ -64,7 +75,7 @@ BG_COLORS = [
 ]
 
 # Priority fonts (shown first in dropdown)
-PRIORITY_FONTS = [
+PRIORITY_FONTS = (
     "Consolas",
     "Segoe UI",
     "Arial",
@@ -73,7 +84,34 @@ PRIORITY_FONTS = [
     "Tahoma",
     "Verdana",
     "Times New Roman",
-]
+)
+PRIORITY_FONTS_SET = frozenset(PRIORITY_FONTS)
+
+# Non-selectable divider between priority fonts and the rest
+FONT_SEPARATOR = "-" * 20
+
+# Installed font families cached on disk, keyed by the font folders' mtimes
+FONT_CACHE_FILE = CONFIG_DIR / "fonts.json"
+FONT_DIRS = (
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+) + (
+    # Per-user fonts (Windows 10 1809+)
+    (os.path.join(os.environ["LOCALAPPDATA"], "Microsoft", "Windows", "Fonts"),)
+    if os.environ.get("LOCALAPPDATA") else ()
+)
+
+# Bindtag for widgets with a hover look; the widget carries its own
+# _sp_normal/_sp_hover option dicts so one class binding serves them all
+HOVER_BINDTAG = "SPHover"
+
+# Palette swatch geometry (pixels) and outline colors
+SWATCH_SIZE = 16
+SWATCH_STEP = SWATCH_SIZE + 2
+SWATCH_OUTLINE = "#555555"
+SWATCH_OUTLINE_HOVER = "#ffffff"
+
+# Minimum delay between opacity preview updates while dragging (~60 Hz)
+OPACITY_PREVIEW_DELAY_MS = 16
 
 # WinAPI constants
 WDA_EXCLUDEFROMCAPTURE = 0x11
@@ -81,26 +119,55 @@ GWL_EXSTYLE = -20
 WS_EX_LAYERED = 0x00080000
 LWA_ALPHA = 0x02
 
-# Load user32.dll once
-user32 = ctypes.windll.user32
+# Load user32.dll once (ctypes.windll only exists on Windows)
+try:
+    user32 = ctypes.windll.user32
+except AttributeError:
+    user32 = None
+
+if user32 is not None:
+    # Typed prototypes bound once at import (64-bit safe). LONG_PTR values are
+    # signed pointer-sized ints, so c_ssize_t returns a plain int (never None)
+    _GetWindowLongPtrW = ctypes.WINFUNCTYPE(
+        ctypes.c_ssize_t, ctypes.c_void_p, ctypes.c_int
+    )(("GetWindowLongPtrW", user32))
+    _SetWindowLongPtrW = ctypes.WINFUNCTYPE(
+        ctypes.c_ssize_t, ctypes.c_void_p, ctypes.c_int, ctypes.c_ssize_t
+    )(("SetWindowLongPtrW", user32))
+    _SetLayeredWindowAttributes = ctypes.WINFUNCTYPE(
+        ctypes.c_int, ctypes.c_void_p, ctypes.c_uint32, ctypes.c_uint8, ctypes.c_uint32
+    )(("SetLayeredWindowAttributes", user32))
+    _SetWindowDisplayAffinity = ctypes.WINFUNCTYPE(
+        ctypes.c_int, ctypes.c_void_p, ctypes.c_uint32
+    )(("SetWindowDisplayAffinity", user32))
+    # Called as user32.GetParent in get_hwnd, so type the shared attribute
+    user32.GetParent.argtypes = [ctypes.c_void_p]
+    user32.GetParent.restype = ctypes.c_void_p
+else:
+    _GetWindowLongPtrW = None
+    _SetWindowLongPtrW = None
+    _SetLayeredWindowAttributes = None
+    _SetWindowDisplayAffinity = None
+
+def _check_windows_compatible() -> bool:
+    """Evaluate the Build 2004+ requirement against the running OS."""
+    if sys.platform != "win32":
+        return False
+    version = sys.getwindowsversion()
+    return version.major >= 10 and version.build >= 19041
+
 
-# Configure function signatures for 64-bit compatibility
-user32.GetWindowLongPtrW.restype = ctypes.c_void_p
-user32.GetWindowLongPtrW.argtypes = [ctypes.c_void_p, ctypes.c_int]
-user32.SetWindowLongPtrW.restype = ctypes.c_void_p
-user32.SetWindowLongPtrW.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p]
-user32.SetLayeredWindowAttributes.argtypes = [
-    ctypes.c_void_p, ctypes.c_uint32, ctypes.c_uint8, ctypes.c_uint32
-]
-user32.SetWindowDisplayAffinity.argtypes = [ctypes.c_void_p, ctypes.c_uint32]
+# OS version cannot change during process lifetime - check once at import
+_IS_WIN_COMPATIBLE = _check_windows_compatible()
 
 
 def is_windows_compatible() -> bool:
     """Check if Windows version supports WDA_EXCLUDEFROMCAPTURE (Build 2004+)."""
-    if sys.platform != "win32":
-        return False
-    version = sys.getwindowsversion()
-    return version.major >= 10 and version.build >= 19041
+    return _IS_WIN_COMPATIBLE
+
+
+# HWND per Tk window, filled on first get_hwnd() call
+_hwnd_cache: "weakref.WeakKeyDictionary[tk.Misc, int]" = weakref.WeakKeyDictionary()
 
 
 def get_hwnd(widget: tk.Tk | tk.Toplevel) -> int:
@@ -110,14 +177,39 @@ def get_hwnd(widget: tk.Tk | tk.Toplevel) -> int:
     Tkinter's winfo_id() returns an internal frame ID, not the top-level
     window handle. Use GetParent() to get the actual HWND that Windows
     manages for screen capture exclusion.
+
+    The result is cached per widget, so call this after the window has been
+    configured (overrideredirect etc.) and realized with update_idletasks().
     """
+    hwnd = _hwnd_cache.get(widget)
+    if hwnd:
+        return hwnd
     frame_id = widget.winfo_id()
-    hwnd = user32.GetParent(frame_id)
-    if hwnd == 0:
-        hwnd = frame_id
+    if user32 is None:
+        return frame_id
+    hwnd = user32.GetParent(frame_id) or frame_id
+    _hwnd_cache[widget] = hwnd
+
+    def _on_destroy(event: tk.Event) -> None:
+        # <Destroy> also fires for children; only the window itself frees
+        # its handle, which Windows may then hand to a new window
+        if event.widget is widget:
+            _applied.discard(hwnd)
+
+    widget.bind("<Destroy>", _on_destroy, add="+")
     return hwnd
 
 
+# Window handles that already have capture exclusion applied (get_hwnd
+# removes a handle again when its window is destroyed)
+_applied: set[int] = set()
+
+
+def _reset_applied() -> None:
+    """Forget which windows have capture exclusion applied (for tests)."""
+    _applied.clear()
+
+
 def set_capture_exclude(hwnd: int) -> bool:
     """
     Apply WDA_EXCLUDEFROMCAPTURE to a window handle.
@@ -131,25 +223,162 @@ def set_capture_exclude(hwnd: int) -> bool:
     2. Call SetLayeredWindowAttributes (makes it compatible with affinity)
     3. Call SetWindowDisplayAffinity
 
+    The steps are idempotent, so repeat calls for a window that already
+    succeeded return True without touching the Win32 API again.
+
     Returns True if successful, False otherwise.
     """
-    if not is_windows_compatible():
+    if user32 is None or not is_windows_compatible():
         return False
+    if hwnd in _applied:
+        return True
     try:
         # Step 1: Get current extended style and add WS_EX_LAYERED
-        ex_style = user32.GetWindowLongPtrW(hwnd, GWL_EXSTYLE)
-        user32.SetWindowLongPtrW(hwnd, GWL_EXSTYLE, ex_style | WS_EX_LAYERED)
+        ex_style = _GetWindowLongPtrW(hwnd, GWL_EXSTYLE)
+        if not ex_style & WS_EX_LAYERED:
+            _SetWindowLongPtrW(hwnd, GWL_EXSTYLE, ex_style | WS_EX_LAYERED)
 
         # Step 2: Set layered attributes (255 = fully opaque, LWA_ALPHA mode)
         # This makes it a "SetLayeredWindowAttributes window" which is
-        # compatible with SetWindowDisplayAffinity (unlike UpdateLayeredWindow)
-        user32.SetLayeredWindowAttributes(hwnd, 0, 255, LWA_ALPHA)
+        # compatible with SetWindowDisplayAffinity (unlike UpdateLayeredWindow).
+        # Not skipped for already-layered windows: those may be using
+        # UpdateLayeredWindow, which is exactly the black-box case.
+        _SetLayeredWindowAttributes(hwnd, 0, 255, LWA_ALPHA)
 
         # Step 3: Now apply capture exclusion
-        result = user32.SetWindowDisplayAffinity(hwnd, WDA_EXCLUDEFROMCAPTURE)
-        return result != 0
-    except Exception:
+        result = _SetWindowDisplayAffinity(hwnd, WDA_EXCLUDEFROMCAPTURE)
+        if result == 0:
+            return False
+        _applied.add(hwnd)
+        return True
+    except (ctypes.ArgumentError, OSError):
+        # Bad handle type or a Win32 fault surfaced by ctypes
+        return False
+
+
+def _set_if_changed(var: tk.Variable, value) -> bool:
+    """Set a Tk variable only if its value differs. Returns True if it was set."""
+    if var.get() == value:
         return False
+    var.set(value)
+    return True
+
+
+def _add_hover(widget: tk.Widget, normal: dict, hover: dict) -> None:
+    """Give widget a hover look handled by the shared HOVER_BINDTAG binding."""
+    widget._sp_normal = normal
+    widget._sp_hover = hover
+    widget.bindtags((HOVER_BINDTAG,) + widget.bindtags())
+
+
+def _make_palette(
+    parent: tk.Widget, colors: list[str], on_select: Callable[[str], None]
+) -> tk.Canvas:
+    """
+    Create a row of clickable color swatches drawn on a single Canvas.
+
+    One widget with three bindings replaces a Label per color; clicks and
+    hover are resolved by hit-testing event.x against the swatch grid.
+    """
+    canvas = tk.Canvas(
+        parent,
+        width=len(colors) * SWATCH_STEP,
+        height=SWATCH_STEP,
+        bg="#333333",
+        highlightthickness=0,
+        cursor="hand2"
+    )
+    items = [
+        canvas.create_rectangle(
+            i * SWATCH_STEP + 1, 1,
+            i * SWATCH_STEP + 1 + SWATCH_SIZE, 1 + SWATCH_SIZE,
+            fill=color, outline=SWATCH_OUTLINE
+        )
+        for i, color in enumerate(colors)
+    ]
+    hovered = -1  # Index of the highlighted swatch (-1 = none)
+
+    def index_at(x: int) -> int:
+        idx = x // SWATCH_STEP
+        return idx if 0 <= idx < len(colors) else -1
+
+    def set_hover(idx: int) -> None:
+        nonlocal hovered
+        if idx == hovered:
+            return
+        if hovered >= 0:
+            canvas.itemconfigure(items[hovered], outline=SWATCH_OUTLINE)
+        if idx >= 0:
+            canvas.itemconfigure(items[idx], outline=SWATCH_OUTLINE_HOVER)
+        hovered = idx
+
+    def on_click(event: tk.Event) -> None:
+        idx = index_at(event.x)
+        if idx >= 0:
+            on_select(colors[idx])
+
+    canvas.bind("<Button-1>", on_click)
+    canvas.bind("<Motion>", lambda e: set_hover(index_at(e.x)))
+    canvas.bind("<Leave>", lambda e: set_hover(-1))
+    return canvas
+
+
+def _font_dirs_stamp() -> list[list]:
+    """Return [path, mtime] pairs for the font folders that exist."""
+    stamp = []
+    for path in FONT_DIRS:
+        try:
+            stamp.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            pass  # Missing folder - nothing to validate against
+    return stamp
+
+
+def _get_font_families() -> list[str]:
+    """
+    Get installed font families, using the on-disk cache when still valid.
+    Installing or removing fonts changes a font folder's mtime, which
+    invalidates the cache.
+    """
+    stamp = _font_dirs_stamp()
+    if not stamp:
+        # No font folders to validate against (non-Windows) - don't cache
+        return list(tkfont.families())
+
+    try:
+        with open(FONT_CACHE_FILE, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("stamp") == stamp:
+            return cached["families"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    families = list(tkfont.families())
+    try:
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        with open(FONT_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"stamp": stamp, "families": families}, f)
+    except OSError:
+        pass
+    return families
+
+
+@functools.lru_cache(maxsize=1)
+def get_prioritized_fonts() -> tuple[str, ...]:
+    """
+    Get font list with common fonts first, then all system fonts.
+
+    tkfont.families() enumerates every installed font and can take seconds
+    on systems with many fonts, so the result is computed once per process
+    and the family list is also cached on disk between runs.
+    Requires a Tk root to exist on first call.
+    """
+    available = set(_get_font_families())
+    prioritized = [f for f in PRIORITY_FONTS if f in available]
+    remaining = sorted(available - PRIORITY_FONTS_SET)
+    if prioritized and remaining:
+        return (*prioritized, FONT_SEPARATOR, *remaining)
+    return tuple(prioritized + remaining)
 
 
 class SettingsPanel(tk.Frame):
@@ -166,6 +395,9 @@ class SettingsPanel(tk.Frame):
 
         panel = SettingsPanel(main_frame, on_opacity_change=on_opacity_change)
         panel.pack(fill=tk.BOTH, expand=True)  # or use show()/hide()
+
+    Create one panel per window and reuse it: show()/hide() are the only
+    lifecycle. Constructing a new panel rebuilds every widget.
     """
 
     def __init__(
@@ -177,6 +409,8 @@ class SettingsPanel(tk.Frame):
         on_bg_color_change: Optional[Callable[[str], None]] = None,
         on_save: Optional[Callable[[], None]] = None,
         on_cancel: Optional[Callable[[], None]] = None,
+        config: Optional[dict] = None,
+        on_restore: Optional[Callable[[dict], None]] = None,
     ):
         """
         Initialize settings panel.
@@ -189,6 +423,10 @@ class SettingsPanel(tk.Frame):
             on_bg_color_change: Callback for background color changes (hex)
             on_save: Callback when settings are saved
             on_cancel: Callback when settings are cancelled
+            config: Already-loaded config dict (skips reading config.json)
+            on_restore: Callback applying all original appearance values at
+                once on cancel (dict with opacity, font_family, font_size,
+                font_color, bg_color); replaces the per-field callbacks there
         """
         super().__init__(parent, bg="#2a2a2a")
 
@@ -198,15 +436,15 @@ class SettingsPanel(tk.Frame):
         self.on_bg_color_change = on_bg_color_change
         self.on_save_callback = on_save
         self.on_cancel_callback = on_cancel
-        self.config = load_config()
+        self.on_restore = on_restore
+        # A passed-in config is the caller's live dict, which it may change
+        # and save at any time; the panel re-reads it on every show()
+        self._shared_config = config
+        self._config_mtime = get_config_mtime()
+        self.config = dict(config) if config is not None else load_config()
 
         # Original values for cancel restore
-        self.original_opacity = self.config.get("opacity", 0.85)
-        self.original_font_family = self.config.get("font_family", "Consolas")
-        self.original_font_size = self.config.get("font_size", 11)
-        self.original_text_color = self.config.get("font_color", "#FFFFFF")
-        self.original_bg_color = self.config.get("bg_color", "#2d2d2d")
-        self.original_auto_check_updates = self.config.get("auto_check_updates", True)
+        self._store_originals()
 
         # Tkinter variables
         self.opacity_var: Optional[tk.DoubleVar] = None
@@ -218,19 +456,38 @@ class SettingsPanel(tk.Frame):
         self.saved = False
         self._visible = False
 
+        # Pending opacity preview (coalesced slider events)
+        self._opacity_pending: Optional[float] = None
+        self._opacity_after_id: Optional[str] = None
+
         self._build_ui()
 
-    def _get_prioritized_fonts(self) -> list[str]:
-        """Get font list with common fonts first, then all system fonts."""
-        available = set(tkfont.families())
-        prioritized = [f for f in PRIORITY_FONTS if f in available]
-        remaining = sorted([f for f in available if f not in prioritized])
-        if prioritized and remaining:
-            return prioritized + ["-" * 20] + remaining
-        return prioritized + remaining
+    def _store_originals(self) -> None:
+        """Snapshot current config values for cancel restore."""
+        config = self.config
+        self.original_opacity = config.get("opacity", 0.85)
+        self.original_font_family = config.get("font_family", "Consolas")
+        self.original_font_size = config.get("font_size", 11)
+        self.original_text_color = config.get("font_color", "#FFFFFF")
+        self.original_bg_color = config.get("bg_color", "#2d2d2d")
+        self.original_auto_check_updates = config.get("auto_check_updates", True)
+
+        # Last font values pushed to on_font_change (skip redundant re-renders)
+        self._last_font_family = self.original_font_family
+        self._last_font_size = self.original_font_size
 
     def _build_ui(self) -> None:
-        """Build the settings panel UI."""
+        """Build the settings panel UI (once, from __init__ - reuse via show()/hide())."""
+        # Hover looks are handled by one class binding instead of per-widget binds
+        self.bind_class(
+            HOVER_BINDTAG, "<Enter>",
+            lambda e: e.widget.configure(**e.widget._sp_hover)
+        )
+        self.bind_class(
+            HOVER_BINDTAG, "<Leave>",
+            lambda e: e.widget.configure(**e.widget._sp_normal)
+        )
+
         # Main container with padding
         main_frame = tk.Frame(self, bg="#2a2a2a", padx=15, pady=10)
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -257,8 +514,7 @@ class SettingsPanel(tk.Frame):
         )
         close_btn.pack(side=tk.RIGHT)
         close_btn.bind("<Button-1>", lambda e: self._on_cancel())
-        close_btn.bind("<Enter>", lambda e: close_btn.configure(fg="#ffffff"))
-        close_btn.bind("<Leave>", lambda e: close_btn.configure(fg="#888888"))
+        _add_hover(close_btn, {"fg": "#888888"}, {"fg": "#ffffff"})
 
         # Opacity section
         opacity_frame = tk.Frame(main_frame, bg="#333333", padx=10, pady=8)
@@ -332,7 +588,7 @@ class SettingsPanel(tk.Frame):
         family_label.pack(side=tk.LEFT)
 
         self.font_family_var = tk.StringVar(value=self.config.get("font_family", "Consolas"))
-        font_families = self._get_prioritized_fonts()
+        font_families = get_prioritized_fonts()
 
         self.font_combo = ttk.Combobox(
             family_row,
@@ -423,23 +679,11 @@ class SettingsPanel(tk.Frame):
         self.text_color_swatch.pack(side=tk.LEFT, padx=(0, 5))
 
         # Text color palette
-        text_palette = tk.Frame(text_color_row, bg="#333333")
+        text_palette = _make_palette(
+            text_color_row, TEXT_COLORS, self._on_text_color_select
+        )
         text_palette.pack(side=tk.LEFT)
 
-        for i, color in enumerate(TEXT_COLORS):
-            swatch = tk.Label(
-                text_palette,
-                text="",
-                bg=color,
-                width=2,
-                height=1,
-                relief=tk.RAISED
-            )
-            swatch.grid(row=0, column=i, padx=1)
-            swatch.bind("<Button-1>", lambda e, c=color: self._on_text_color_select(c))
-            swatch.bind("<Enter>", lambda e, s=swatch: s.configure(relief=tk.GROOVE))
-            swatch.bind("<Leave>", lambda e, s=swatch: s.configure(relief=tk.RAISED))
-
         # Background color row
         bg_color_row = tk.Frame(color_frame, bg="#333333")
         bg_color_row.pack(fill=tk.X, pady=(3, 0))
@@ -469,23 +713,11 @@ class SettingsPanel(tk.Frame):
         self.bg_color_swatch.pack(side=tk.LEFT, padx=(0, 5))
 
         # Background color palette
-        bg_palette = tk.Frame(bg_color_row, bg="#333333")
+        bg_palette = _make_palette(
+            bg_color_row, BG_COLORS, self._on_bg_color_select
+        )
         bg_palette.pack(side=tk.LEFT)
 
-        for i, color in enumerate(BG_COLORS):
-            swatch = tk.Label(
-                bg_palette,
-                text="",
-                bg=color,
-                width=2,
-                height=1,
-                relief=tk.RAISED
-            )
-            swatch.grid(row=0, column=i, padx=1)
-            swatch.bind("<Button-1>", lambda e, c=color: self._on_bg_color_select(c))
-            swatch.bind("<Enter>", lambda e, s=swatch: s.configure(relief=tk.GROOVE))
-            swatch.bind("<Leave>", lambda e, s=swatch: s.configure(relief=tk.RAISED))
-
         # Updates section
         updates_frame = tk.Frame(main_frame, bg="#333333", padx=10, pady=8)
         updates_frame.pack(fill=tk.X, pady=(0, 8))
@@ -534,8 +766,7 @@ class SettingsPanel(tk.Frame):
         )
         docs_link.pack(side=tk.LEFT)
         docs_link.bind("<Button-1>", lambda e: self._open_docs())
-        docs_link.bind("<Enter>", lambda e: docs_link.configure(fg="#88bbee"))
-        docs_link.bind("<Leave>", lambda e: docs_link.configure(fg="#6699cc"))
+        _add_hover(docs_link, {"fg": "#6699cc"}, {"fg": "#88bbee"})
 
         cancel_btn = tk.Button(
             button_frame,
@@ -567,38 +798,36 @@ class SettingsPanel(tk.Frame):
 
     def show(self) -> None:
         """Show the settings panel."""
-        # Refresh config and all original values when showing
-        self.config = load_config()
+        if self._shared_config is not None:
+            self.config = dict(self._shared_config)
+        else:
+            # Refresh config only if config.json changed since we last read it
+            mtime = get_config_mtime()
+            if mtime != self._config_mtime:
+                self.config = load_config()
+                self._config_mtime = mtime
 
         # Store original values for cancel restore
-        self.original_opacity = self.config.get("opacity", 0.85)
-        self.original_font_family = self.config.get("font_family", "Consolas")
-        self.original_font_size = self.config.get("font_size", 11)
-        self.original_text_color = self.config.get("font_color", "#FFFFFF")
-        self.original_bg_color = self.config.get("bg_color", "#2d2d2d")
-        self.original_auto_check_updates = self.config.get("auto_check_updates", True)
-
-        # Update UI to match config
-        if self.opacity_var:
-            self.opacity_var.set(self.original_opacity)
+        self._store_originals()
+
+        # Update UI to match config (only touch Tk where values differ)
+        if self.opacity_var and _set_if_changed(self.opacity_var, self.original_opacity):
             self.opacity_label.config(text=f"{self.original_opacity:.0%}")
 
         if self.font_family_var:
-            self.font_family_var.set(self.original_font_family)
+            _set_if_changed(self.font_family_var, self.original_font_family)
 
         if self.font_size_var:
-            self.font_size_var.set(str(self.original_font_size))
+            _set_if_changed(self.font_size_var, str(self.original_font_size))
 
-        if self.text_color_var:
-            self.text_color_var.set(self.original_text_color)
+        if self.text_color_var and _set_if_changed(self.text_color_var, self.original_text_color):
             self.text_color_swatch.configure(bg=self.original_text_color)
 
-        if self.bg_color_var:
-            self.bg_color_var.set(self.original_bg_color)
+        if self.bg_color_var and _set_if_changed(self.bg_color_var, self.original_bg_color):
             self.bg_color_swatch.configure(bg=self.original_bg_color)
 
         if hasattr(self, 'auto_check_updates_var'):
-            self.auto_check_updates_var.set(self.original_auto_check_updates)
+            _set_if_changed(self.auto_check_updates_var, self.original_auto_check_updates)
 
         self.saved = False
         self._visible = True
@@ -621,20 +850,42 @@ class SettingsPanel(tk.Frame):
             self.show()
 
     def _on_opacity_slide(self, value: str) -> None:
-        """Handle opacity slider movement."""
-        opacity = float(value)
+        """Handle opacity slider movement (coalesced to ~60 Hz)."""
+        self._opacity_pending = float(value)
+        if self._opacity_after_id is None:
+            self._opacity_after_id = self.after(
+                OPACITY_PREVIEW_DELAY_MS, self._flush_opacity
+            )
+
+    def _flush_opacity(self) -> None:
+        """Apply the latest pending opacity to the label and preview."""
+        self._opacity_after_id = None
+        opacity = self._opacity_pending
+        if opacity is None:
+            return
+        self._opacity_pending = None
         self.opacity_label.config(text=f"{opacity:.0%}")
 
         # Real-time preview callback
         if self.on_opacity_change:
             self.on_opacity_change(opacity)
 
+    def _cancel_opacity_flush(self) -> None:
+        """Drop any pending opacity preview update."""
+        if self._opacity_after_id is not None:
+            self.after_cancel(self._opacity_after_id)
+            self._opacity_after_id = None
+        self._opacity_pending = None
+
     def _on_font_family_change(self, event=None) -> None:
         """Handle font family selection change."""
         family = self.font_family_var.get()
         # Skip separator line
-        if family.startswith("-"):
+        if family == FONT_SEPARATOR:
             return
+        if family == self._last_font_family:
+            return
+        self._last_font_family = family
         if self.on_font_change:
             try:
                 size = int(self.font_size_var.get())
@@ -644,14 +895,18 @@ class SettingsPanel(tk.Frame):
 
     def _on_font_size_change(self, event=None) -> None:
         """Handle font size change."""
+        raw = self.font_size_var.get()
         try:
-            size = int(self.font_size_var.get())
             # Clamp to valid range
-            size = max(8, min(48, size))
-            self.font_size_var.set(str(size))
+            size = max(8, min(48, int(raw)))
         except ValueError:
             size = 11
-            self.font_size_var.set("11")
+        if raw != str(size):
+            self.font_size_var.set(str(size))
+
+        if size == self._last_font_size:
+            return
+        self._last_font_size = size
 
         if self.on_font_change:
             family = self.font_family_var.get()
@@ -673,30 +928,50 @@ class SettingsPanel(tk.Frame):
 
     def _on_save(self) -> None:
         """Save settings and hide panel."""
+        # Make sure the preview reflects the final slider position
+        if self._opacity_after_id is not None:
+            self.after_cancel(self._opacity_after_id)
+            self._flush_opacity()
+
+        # Collect only the fields that actually changed
+        new: dict = {}
+
         if self.opacity_var:
-            self.config["opacity"] = round(self.opacity_var.get(), 2)
+            new["opacity"] = round(self.opacity_var.get(), 2)
 
         if self.font_family_var:
             family = self.font_family_var.get()
-            if not family.startswith("-"):  # Skip separator
-                self.config["font_family"] = family
+            if family != FONT_SEPARATOR:  # Skip separator
+                new["font_family"] = family
 
         if self.font_size_var:
             try:
-                self.config["font_size"] = int(self.font_size_var.get())
+                new["font_size"] = int(self.font_size_var.get())
             except ValueError:
                 pass
 
         if self.text_color_var:
-            self.config["font_color"] = self.text_color_var.get()
+            new["font_color"] = self.text_color_var.get()
 
         if self.bg_color_var:
-            self.config["bg_color"] = self.bg_color_var.get()
+            new["bg_color"] = self.bg_color_var.get()
 
         if hasattr(self, 'auto_check_updates_var'):
-            self.config["auto_check_updates"] = self.auto_check_updates_var.get()
+            new["auto_check_updates"] = self.auto_check_updates_var.get()
+
+        new = {k: v for k, v in new.items() if self.config.get(k) != v}
+
+        # Skip disk I/O entirely when nothing changed
+        if new:
+            self.config.update(new)
+            if self._shared_config is not None:
+                # Save the caller's dict so its newer fields aren't overwritten
+                self._shared_config.update(new)
+                save_config(self._shared_config)
+            else:
+                save_config(self.config)
+            self._config_mtime = get_config_mtime()
 
-        save_config(self.config)
         self.saved = True
         self.hide()
 
@@ -705,21 +980,36 @@ class SettingsPanel(tk.Frame):
 
     def _on_cancel(self) -> None:
         """Cancel and restore all original values."""
-        # Restore opacity
-        if self.on_opacity_change:
-            self.on_opacity_change(self.original_opacity)
+        self._cancel_opacity_flush()
+
+        if self.on_restore:
+            # Restore everything in one batched callback
+            self.on_restore({
+                "opacity": self.original_opacity,
+                "font_family": self.original_font_family,
+                "font_size": self.original_font_size,
+                "font_color": self.original_text_color,
+                "bg_color": self.original_bg_color,
+            })
+        else:
+            # Restore opacity
+            if self.on_opacity_change:
+                self.on_opacity_change(self.original_opacity)
 
-        # Restore font
-        if self.on_font_change:
-            self.on_font_change(self.original_font_family, self.original_font_size)
+            # Restore font
+            if self.on_font_change:
+                self.on_font_change(self.original_font_family, self.original_font_size)
 
-        # Restore text color
-        if self.on_text_color_change:
-            self.on_text_color_change(self.original_text_color)
+            # Restore text color
+            if self.on_text_color_change:
+                self.on_text_color_change(self.original_text_color)
 
-        # Restore background color
-        if self.on_bg_color_change:
-            self.on_bg_color_change(self.original_bg_color)
+            # Restore background color
+            if self.on_bg_color_change:
+                self.on_bg_color_change(self.original_bg_color)
+
+        self._last_font_family = self.original_font_family
+        self._last_font_size = self.original_font_size
 
         self.saved = False
         self.hide()
@@ -754,12 +1044,19 @@ if __name__ == "__main__":
     # Load config for test text widget
     config = load_config()
 
+    # Named font updated in place by the font callbacks
+    test_font = tkfont.Font(
+        name="overlayFont",
+        family=config.get("font_family", "Consolas"),
+        size=config.get("font_size", 11)
+    )
+
     # Test text widget to show font/color changes
     test_text = tk.Text(
         content_frame,
         bg=config.get("bg_color", "#2d2d2d"),
         fg=config.get("font_color", "#FFFFFF"),
-        font=(config.get("font_family", "Consolas"), config.get("font_size", 11)),
+        font=test_font,
         wrap=tk.WORD,
         height=6,
         padx=10,
@@ -769,8 +1066,6 @@ if __name__ == "__main__":
                             "Open settings to modify appearance.")
     test_text.pack(fill=tk.BOTH, expand=True, pady=20, padx=20)
 
-    # Settings panel (hidden initially)
-    settings_panel: Optional[SettingsPanel] = None
 
     def update_opacity(val: float) -> None:
         print(f"Opacity changed to: {val:.0%}")
@@ -778,7 +1073,7 @@ if __name__ == "__main__":
 
     def update_font(family: str, size: int) -> None:
         print(f"Font changed to: {family} {size}pt")
-        test_text.configure(font=(family, size))
+        test_font.configure(family=family, size=size)
 
     def update_text_color(color: str) -> None:
         print(f"Text color changed to: {color}")
@@ -788,6 +1083,12 @@ if __name__ == "__main__":
         print(f"Background color changed to: {color}")
         test_text.configure(bg=color)
 
+    def restore_appearance(values: dict) -> None:
+        print("Settings restored.")
+        root.attributes("-alpha", values["opacity"])
+        test_font.configure(family=values["font_family"], size=values["font_size"])
+        test_text.configure(fg=values["font_color"], bg=values["bg_color"])
+
     def on_settings_save() -> None:
         print("Settings saved!")
         test_text.pack(fill=tk.BOTH, expand=True, pady=20, padx=20)
@@ -796,19 +1097,20 @@ if __name__ == "__main__":
         print("Settings cancelled.")
         test_text.pack(fill=tk.BOTH, expand=True, pady=20, padx=20)
 
-    def toggle_settings() -> None:
-        global settings_panel
-        if settings_panel is None:
-            settings_panel = SettingsPanel(
-                content_frame,
-                on_opacity_change=update_opacity,
-                on_font_change=update_font,
-                on_text_color_change=update_text_color,
-                on_bg_color_change=update_bg_color,
-                on_save=on_settings_save,
-                on_cancel=on_settings_cancel
-            )
+    # Settings panel: built once up front, hidden until toggled
+    settings_panel = SettingsPanel(
+        content_frame,
+        on_opacity_change=update_opacity,
+        on_font_change=update_font,
+        on_text_color_change=update_text_color,
+        on_bg_color_change=update_bg_color,
+        on_save=on_settings_save,
+        on_cancel=on_settings_cancel,
+        on_restore=restore_appearance
+    )
+    settings_panel.pack_forget()
 
+    def toggle_settings() -> None:
         if settings_panel.is_visible():
             settings_panel.toggle()
         else:
@@ -3,52 +3,96 @@ Auto-updater for ScreenPrompt.
 Checks GitHub releases for updates and handles download/install.
 """
 
+import functools
+import gzip
+import http.client
 import json
 import os
+import queue
 import sys
 import tempfile
 import threading
+import time
 import urllib.request
 import urllib.error
+import urllib.parse
 from typing import Optional, Callable
 
+# Optional: orjson parses the releases payload faster. Both parsers accept
+# the raw response bytes, so no separate decode step is needed.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+from config_manager import CONFIG_DIR
+
 # GitHub repository info
 GITHUB_REPO = "dan0dev/ScreenPrompt"
-GITHUB_API_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+GITHUB_API_HOST = "api.github.com"
+GITHUB_API_PATH = f"/repos/{GITHUB_REPO}/releases/latest"
+GITHUB_API_URL = f"https://{GITHUB_API_HOST}{GITHUB_API_PATH}"
 
-# Current version (read from version.txt or fallback)
-def get_current_version() -> str:
-    """Get current application version."""
-    try:
-        # Try to find version.txt in common locations
-        version_paths = [
-            os.path.join(os.path.dirname(__file__), '..', 'version.txt'),
-            os.path.join(os.path.dirname(__file__), 'version.txt'),
-        ]
+# Release asset names that identify the Windows installer
+INSTALLER_SUFFIXES = ("-Setup.exe", "-setup.exe")
+
+# Last releases API response, reused within the TTL and revalidated with
+# ETag/Last-Modified afterwards (a 304 costs no rate limit and no JSON parse)
+UPDATE_CACHE_FILE = CONFIG_DIR / "update_cache.json"
+UPDATE_CACHE_TTL = 30 * 60  # seconds
+
+# Optional GitHub token (env var or file) lifts the API limit from 60 to
+# 5000 requests/hour; while rate limited no request is sent at all
+GITHUB_TOKEN_ENV = "SCREENPROMPT_GH_TOKEN"
+GITHUB_TOKEN_FILE = CONFIG_DIR / "token"
+
+# Installers at least this large are fetched as concurrent byte ranges
+PARALLEL_DOWNLOAD_PARTS = 4
+PARALLEL_DOWNLOAD_MIN_SIZE = 4 * 1024 * 1024
+
+# Large reads keep the copy loop cheap; progress is published at most ~20 Hz
+DOWNLOAD_BLOCK_SIZE = 1 << 20
+PROGRESS_INTERVAL = 0.05  # seconds
+
+# Redirects followed by _request, matching urllib's own handling
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+
+# Candidate version.txt locations, resolved once at import. When running as
+# a frozen exe the bundled copy is checked first (the likeliest hit there).
+_HERE = os.path.dirname(__file__)
+_VERSION_PATHS: tuple[str, ...] = (
+    *((os.path.join(sys._MEIPASS, 'version.txt'),) if hasattr(sys, '_MEIPASS') else ()),
+    os.path.join(_HERE, '..', 'version.txt'),
+    os.path.join(_HERE, 'version.txt'),
+)
 
-        # When running as frozen exe
-        if hasattr(sys, '_MEIPASS'):
-            version_paths.insert(0, os.path.join(sys._MEIPASS, 'version.txt'))
 
-        for path in version_paths:
-            if os.path.exists(path):
-                with open(path, 'r') as f:
-                    return f.read().strip()
-    except Exception:
-        pass
+# Current version (read from version.txt or fallback)
+@functools.lru_cache(maxsize=1)
+def get_current_version() -> str:
+    """Get current application version (read once per process)."""
+    # Just try to open each candidate; a miss costs one failed syscall
+    for path in _VERSION_PATHS:
+        try:
+            with open(path, 'r') as f:
+                return f.read().strip()
+        except (OSError, UnicodeDecodeError):
+            continue
 
     return "1.0.0"  # Fallback
 
 
+@functools.lru_cache(maxsize=32)
 def parse_version(version_str: str) -> tuple:
-    """Parse version string into comparable tuple."""
+    """Parse version string into comparable tuple (memoized)."""
     # Remove 'v' prefix if present
-    version_str = version_str.lstrip('v')
+    if version_str[:1] == 'v':
+        version_str = version_str[1:]
 
     # Split and convert to integers
     try:
-        parts = version_str.split('.')
-        return tuple(int(p) for p in parts)
+        return tuple(map(int, version_str.split('.')))
     except (ValueError, AttributeError):
         return (0, 0, 0)
 
@@ -58,6 +102,38 @@ def is_newer_version(latest: str, current: str) -> bool:
     return parse_version(latest) > parse_version(current)
 
 
+# Update checks and downloads share a small pool of daemon threads that is
+# started on first use and reused for the rest of the process
+IO_WORKERS = 2
+_io_tasks: queue.SimpleQueue = queue.SimpleQueue()
+_io_threads: list[threading.Thread] = []
+_io_lock = threading.Lock()
+
+
+def _io_worker() -> None:
+    """Run queued background tasks forever."""
+    while True:
+        task = _io_tasks.get()
+        try:
+            task()
+        except Exception:
+            pass  # Keep the worker alive; tasks report their own results
+
+
+def _submit_io(task: Callable[[], None]) -> None:
+    """Queue task on the background I/O pool, starting a worker if needed."""
+    with _io_lock:
+        if len(_io_threads) < IO_WORKERS:
+            thread = threading.Thread(
+                target=_io_worker,
+                name=f'sp-updater-{len(_io_threads)}',
+                daemon=True
+            )
+            thread.start()
+            _io_threads.append(thread)
+    _io_tasks.put(task)
+
+
 class UpdateChecker:
     """Handles checking for and downloading updates."""
 
@@ -68,6 +144,199 @@ class UpdateChecker:
         self.downloaded_path: Optional[str] = None
         self._download_progress: float = 0
         self._is_downloading: bool = False
+        self._cache: dict = self._load_cache()
+        self._token: Optional[str] = self._load_token()
+        # Keep-alive HTTPS connections per host, reused across checks.
+        # Checks may run on any I/O worker, so each thread keeps its own.
+        self._local = threading.local()
+
+    @property
+    def _connections(self) -> dict[str, http.client.HTTPSConnection]:
+        """The calling thread's connections, keyed by host."""
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        return connections
+
+    def _conn(self, host: str) -> http.client.HTTPSConnection:
+        """Get the pooled connection for host, creating it on first use."""
+        conn = self._connections.get(host)
+        if conn is None:
+            conn = http.client.HTTPSConnection(host, timeout=10)
+            self._connections[host] = conn
+        return conn
+
+    def _send(
+        self, host: str, method: str, path: str, headers: dict
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        Send one request over the pooled connection for host.
+
+        A reused connection may have been closed by the server while idle;
+        in that case it is dropped and the request retried once on a new one.
+
+        Returns:
+            tuple: (status, headers, body)
+        """
+        reused = host in self._connections
+        while True:
+            conn = self._conn(host)
+            try:
+                conn.request(method, path, headers=headers)
+                response = conn.getresponse()
+                return response.status, response.headers, response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._connections.pop(host, None)
+                if not reused:
+                    raise
+                reused = False
+
+    def _request(
+        self, host: str, method: str, path: str, headers: dict
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        Send a request over the pooled connections, following redirects.
+
+        Like urllib, follows up to MAX_REDIRECTS HTTPS redirects (a 303
+        switches to GET). The token is only sent to the original host.
+
+        Returns:
+            tuple: (status, headers, body)
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            status, response_headers, body = self._send(host, method, path, headers)
+            location = response_headers.get('Location')
+            if status not in REDIRECT_STATUSES or not location:
+                return status, response_headers, body
+
+            target = urllib.parse.urlsplit(
+                urllib.parse.urljoin(f'https://{host}{path}', location)
+            )
+            if target.scheme != 'https' or not target.netloc:
+                raise http.client.HTTPException(f"Refusing redirect to {location}")
+            if target.netloc != host:
+                headers = {k: v for k, v in headers.items() if k != 'Authorization'}
+            host = target.netloc
+            path = target.path or '/'
+            if target.query:
+                path += f'?{target.query}'
+            if status == 303:
+                method = 'GET'
+        raise http.client.HTTPException("Too many redirects")
+
+    @staticmethod
+    def _load_token() -> Optional[str]:
+        """Return the GitHub API token from the environment or token file."""
+        token = os.environ.get(GITHUB_TOKEN_ENV)
+        if not token:
+            try:
+                with open(GITHUB_TOKEN_FILE, 'r', encoding='utf-8') as f:
+                    token = f.read()
+            except OSError:
+                return None
+        return token.strip() or None
+
+    @staticmethod
+    def _load_cache() -> dict:
+        """Load the cached releases API response (empty dict if unavailable)."""
+        try:
+            with open(UPDATE_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self) -> None:
+        """Write the release cache atomically (temp file + os.replace)."""
+        try:
+            CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = f"{UPDATE_CACHE_FILE}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._cache, f)
+            os.replace(tmp_path, UPDATE_CACHE_FILE)
+        except OSError:
+            pass
+
+    def _fetch_release(self) -> dict:
+        """
+        Return latest release info, using the on-disk cache when possible.
+
+        Within UPDATE_CACHE_TTL no request is made. After that a conditional
+        GET is sent; on 304 Not Modified the cached fields are reused.
+        While GitHub reports us rate limited, the cached release (if any)
+        is returned without touching the network.
+        """
+        cache = self._cache
+        now = time.time()
+        if cache.get('tag_name') and now - cache.get('fetched_at', 0) < UPDATE_CACHE_TTL:
+            return cache
+        if now < cache.get('rate_limit_until', 0):
+            if cache.get('tag_name'):
+                return cache
+            raise http.client.HTTPException("GitHub API rate limit in effect")
+
+        # Create request with headers (GitHub API requires User-Agent)
+        headers = {
+            'User-Agent': 'ScreenPrompt-Updater',
+            'Accept': 'application/vnd.github.v3+json',
+            'Accept-Encoding': 'gzip'
+        }
+        if self._token:
+            headers['Authorization'] = f'Bearer {self._token}'
+        if cache.get('etag'):
+            headers['If-None-Match'] = cache['etag']
+        if cache.get('last_modified'):
+            headers['If-Modified-Since'] = cache['last_modified']
+        status, response_headers, body = self._request(
+            GITHUB_API_HOST, 'GET', GITHUB_API_PATH, headers
+        )
+        if status == 304 and cache.get('tag_name'):
+            cache['fetched_at'] = now
+            self._save_cache()
+            return cache
+        if status in (403, 429):
+            # Back off until GitHub's reset time (or one TTL if not given)
+            try:
+                reset = float(response_headers.get('X-RateLimit-Reset', ''))
+            except ValueError:
+                reset = now + UPDATE_CACHE_TTL
+            cache['rate_limit_until'] = reset
+            self._save_cache()
+            raise http.client.HTTPException(f"GitHub API returned HTTP {status}")
+        if status != 200:
+            raise http.client.HTTPException(f"GitHub API returned HTTP {status}")
+
+        if response_headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+
+        # Parsed in one go: 'body' (the release notes) is the last key GitHub
+        # serializes, so an incremental parser could not stop any earlier.
+        # Full parses only happen on a 200, i.e. when the release changed.
+        data = _json_loads(body)
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+
+        # Find the installer asset (first match wins)
+        asset_url = next(
+            (
+                asset.get('browser_download_url')
+                for asset in data.get('assets', [])
+                if asset.get('name', '').endswith(INSTALLER_SUFFIXES)
+            ),
+            None
+        )
+
+        self._cache = {
+            'tag_name': data.get('tag_name', ''),
+            'body': data.get('body', ''),
+            'asset_url': asset_url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': now,
+        }
+        self._save_cache()
+        return self._cache
 
     def check_for_updates(self) -> tuple[bool, Optional[str], Optional[str]]:
         """
@@ -77,28 +346,12 @@ class UpdateChecker:
             tuple: (update_available, latest_version, release_notes)
         """
         try:
-            # Create request with headers (GitHub API requires User-Agent)
-            request = urllib.request.Request(
-                GITHUB_API_URL,
-                headers={
-                    'User-Agent': 'ScreenPrompt-Updater',
-                    'Accept': 'application/vnd.github.v3+json'
-                }
-            )
-
-            with urllib.request.urlopen(request, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
+            release = self._fetch_release()
 
-            self.latest_version = data.get('tag_name', '').lstrip('v')
-            self.release_notes = data.get('body', '')
-
-            # Find the installer asset
-            assets = data.get('assets', [])
-            for asset in assets:
-                name = asset.get('name', '').lower()
-                if name.endswith('-setup.exe'):
-                    self.download_url = asset.get('browser_download_url')
-                    break
+            self.latest_version = release.get('tag_name', '').lstrip('v')
+            self.release_notes = release.get('body', '')
+            if release.get('asset_url'):
+                self.download_url = release['asset_url']
 
             current_version = get_current_version()
             update_available = is_newer_version(self.latest_version, current_version)
@@ -112,52 +365,46 @@ class UpdateChecker:
             # Other errors - silently fail
             return False, None, None
 
-    def download_update(self, progress_callback: Optional[Callable[[float], None]] = None) -> Optional[str]:
+    def download_update(self) -> Optional[str]:
         """
         Download the update installer.
 
-        Args:
-            progress_callback: Optional callback with progress (0.0 to 1.0)
+        Progress is published through the download_progress property
+        (0.0 to 1.0); UI code should poll it rather than be called back
+        from the download thread.
 
         Returns:
             Path to downloaded installer, or None on failure
         """
-        if not self.download_url:
-            return None
-
         self._is_downloading = True
         self._download_progress = 0
 
+        # Everything after the flag is set runs under the finally that
+        # clears it, including the early exit (download_update_async has
+        # already marked us busy)
         try:
+            if not self.download_url:
+                return None
+
             # Create temp directory for download
             temp_dir = tempfile.mkdtemp(prefix='screenprompt_update_')
             filename = f"ScreenPrompt-{self.latest_version}-Setup.exe"
             download_path = os.path.join(temp_dir, filename)
 
-            # Create request
-            request = urllib.request.Request(
-                self.download_url,
-                headers={'User-Agent': 'ScreenPrompt-Updater'}
-            )
-
-            with urllib.request.urlopen(request, timeout=60) as response:
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded = 0
-                block_size = 8192
-
-                with open(download_path, 'wb') as f:
-                    while True:
-                        block = response.read(block_size)
-                        if not block:
-                            break
-
-                        f.write(block)
-                        downloaded += len(block)
-
-                        if total_size > 0:
-                            self._download_progress = downloaded / total_size
-                            if progress_callback:
-                                progress_callback(self._download_progress)
+            url, total_size, ranges_ok = self._probe_download()
+            if ranges_ok and total_size >= PARALLEL_DOWNLOAD_MIN_SIZE:
+                try:
+                    self._download_parallel(url, download_path, total_size)
+                except Exception:
+                    # Server did not honor ranges after all; restart as a plain
+                    # download. Use a fresh file: cancelled range threads are
+                    # not waited for and may still be finishing a block
+                    self._download_progress = 0
+                    temp_dir = tempfile.mkdtemp(prefix='screenprompt_update_')
+                    download_path = os.path.join(temp_dir, filename)
+                    self._download_serial(download_path)
+            else:
+                self._download_serial(download_path)
 
             self.downloaded_path = download_path
             return download_path
@@ -167,25 +414,153 @@ class UpdateChecker:
         finally:
             self._is_downloading = False
 
+    def _probe_download(self) -> tuple[str, int, bool]:
+        """
+        HEAD the installer URL (following redirects).
+
+        Returns:
+            tuple: (final_url, content_length, supports_byte_ranges)
+        """
+        request = urllib.request.Request(
+            self.download_url,
+            headers={'User-Agent': 'ScreenPrompt-Updater'},
+            method='HEAD'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                total_size = int(response.headers.get('content-length', 0))
+                ranges_ok = response.headers.get('accept-ranges', '').lower() == 'bytes'
+                return response.geturl(), total_size, ranges_ok
+        except (urllib.error.URLError, OSError, ValueError):
+            return self.download_url, 0, False
+
+    def _download_serial(self, download_path: str) -> None:
+        """Download the installer over a single connection."""
+        request = urllib.request.Request(
+            self.download_url,
+            headers={'User-Agent': 'ScreenPrompt-Updater'}
+        )
+
+        with urllib.request.urlopen(request, timeout=60) as response:
+            total_size = int(response.headers.get('content-length', 0))
+            downloaded = 0
+
+            with open(download_path, 'wb') as f:
+                while True:
+                    block = response.read(DOWNLOAD_BLOCK_SIZE)
+                    if not block:
+                        break
+
+                    f.write(block)
+                    downloaded += len(block)
+
+                    if total_size > 0:
+                        # Plain float store; readers sample it without locking
+                        self._download_progress = downloaded / total_size
+
+    def _download_parallel(
+        self,
+        url: str,
+        download_path: str,
+        total_size: int
+    ) -> None:
+        """
+        Download the installer as concurrent byte-range requests.
+
+        The file is pre-sized and each worker writes its own range through
+        its own handle (os.pwrite is not available on Windows). The calling
+        thread publishes progress every PROGRESS_INTERVAL while it waits.
+        """
+        with open(download_path, 'wb') as f:
+            f.truncate(total_size)
+
+        part_size = -(-total_size // PARALLEL_DOWNLOAD_PARTS)  # ceil
+        ranges = [
+            (start, min(start + part_size, total_size) - 1)
+            for start in range(0, total_size, part_size)
+        ]
+        downloaded = 0
+        lock = threading.Lock()
+        # Set when any range fails (or we stop waiting) so the others quit early
+        cancel = threading.Event()
+        errors: list[BaseException] = []
+
+        def fetch(start: int, end: int) -> None:
+            nonlocal downloaded
+            request = urllib.request.Request(
+                url,
+                headers={
+                    'User-Agent': 'ScreenPrompt-Updater',
+                    'Range': f'bytes={start}-{end}'
+                }
+            )
+            with urllib.request.urlopen(request, timeout=60) as response:
+                if response.status != 206:
+                    raise IOError(f"Range request not honored (HTTP {response.status})")
+                with open(download_path, 'r+b') as f:
+                    f.seek(start)
+                    written = 0
+                    while True:
+                        block = response.read(DOWNLOAD_BLOCK_SIZE)
+                        if not block or cancel.is_set():
+                            break
+                        f.write(block)
+                        written += len(block)
+                        with lock:
+                            downloaded += len(block)
+            if written != end - start + 1 and not cancel.is_set():
+                raise IOError(f"Incomplete range {start}-{end}")
+
+        def run(start: int, end: int) -> None:
+            try:
+                fetch(start, end)
+            except BaseException as e:
+                errors.append(e)
+                cancel.set()
+
+        # Daemon threads, like the _submit_io pool: closing the app never
+        # waits for a range to finish
+        threads = [
+            threading.Thread(
+                target=run, args=span, name=f'sp-range-{i}', daemon=True
+            )
+            for i, span in enumerate(ranges)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive() and not cancel.is_set():
+                    thread.join(PROGRESS_INTERVAL)
+                    self._download_progress = downloaded / total_size
+                if cancel.is_set():
+                    break
+        finally:
+            # Stop any ranges still running if we leave early
+            cancel.set()
+        if errors:
+            raise errors[0]
+        self._download_progress = downloaded / total_size
+
     def download_update_async(
         self,
-        progress_callback: Optional[Callable[[float], None]] = None,
         complete_callback: Optional[Callable[[Optional[str]], None]] = None
     ) -> None:
         """
-        Download update in background thread.
+        Download update on the background I/O pool.
 
         Args:
-            progress_callback: Called with progress (0.0 to 1.0)
             complete_callback: Called with download path (or None on failure)
         """
+        # Mark busy before the task is queued so pollers never see a gap
+        self._is_downloading = True
+
         def _download():
-            result = self.download_update(progress_callback)
+            result = self.download_update()
             if complete_callback:
                 complete_callback(result)
 
-        thread = threading.Thread(target=_download, daemon=True)
-        thread.start()
+        _submit_io(_download)
 
     def install_update(self) -> bool:
         """
@@ -237,7 +612,7 @@ def check_for_updates_sync() -> tuple[bool, Optional[str], Optional[str]]:
 
 def check_for_updates_async(callback: Callable[[bool, Optional[str], Optional[str]], None]) -> None:
     """
-    Check for updates in background thread.
+    Check for updates on the background I/O pool.
 
     Args:
         callback: Called with (update_available, latest_version, release_notes)
@@ -246,5 +621,4 @@ def check_for_updates_async(callback: Callable[[bool, Optional[str], Optional[st
         result = get_updater().check_for_updates()
         callback(*result)
 
-    thread = threading.Thread(target=_check, daemon=True)
-    thread.start()
+    _submit_io(_check)
@@ -0,0 +1,11 @@
+# MIT License
+# Copyright (c) 2026 ScreenPrompt Contributors
+
+"""
+Shared pytest setup: make the modules in src/ importable for every test file.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
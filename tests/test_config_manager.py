@@ -7,37 +7,56 @@ Unit tests for config_manager module.
 
 import json
 import os
-import sys
+import re
 import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-
+import config_manager
 from config_manager import (
     DEFAULT_CONFIG,
+    MAX_CONFIG_BYTES,
+    get_config_mtime,
+    is_valid_hex_color,
     load_config,
     save_config,
     is_first_run,
     mark_first_run_complete,
 )
 
+# Compiled once for all schema tests
+HEX_COLOR_PATTERN = re.compile(r'^#[0-9A-Fa-f]{6}\Z')
+
 
 class TestConfigManager(unittest.TestCase):
     """Test cases for config_manager."""
 
-    def setUp(self):
-        """Create a temporary directory for test config files."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_file = Path(self.temp_dir) / "config.json"
+    @classmethod
+    def setUpClass(cls):
+        """Create one temporary directory shared by all tests in the class."""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.config_file = Path(cls.temp_dir) / "config.json"
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the shared temporary directory."""
+        os.rmdir(cls.temp_dir)
 
     def tearDown(self):
-        """Clean up temporary files."""
-        if self.config_file.exists():
-            self.config_file.unlink()
-        os.rmdir(self.temp_dir)
+        """Clean up the config file and the parse cache between tests."""
+        self.config_file.unlink(missing_ok=True)
+        config_manager._load_cache = None
+
+    def _use_temp_config(self):
+        """Point CONFIG_DIR/CONFIG_FILE at the temp dir until the test ends."""
+        patcher = patch.multiple(
+            'config_manager',
+            CONFIG_DIR=Path(self.temp_dir),
+            CONFIG_FILE=self.config_file,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     @patch('config_manager.CONFIG_FILE')
     @patch('config_manager.CONFIG_DIR')
@@ -74,27 +93,48 @@ class TestConfigManager(unittest.TestCase):
         self.assertTrue(DEFAULT_CONFIG['font_color'].startswith('#'))
         self.assertTrue(DEFAULT_CONFIG['bg_color'].startswith('#'))
 
-    @patch('config_manager.CONFIG_FILE')
-    @patch('config_manager.CONFIG_DIR')
-    def test_save_and_load_config(self, mock_dir, mock_file):
+    def test_save_and_load_config(self):
         """Config should be saved and loaded correctly."""
-        mock_dir.__truediv__ = lambda self, x: Path(self.temp_dir)
-        mock_dir.mkdir = lambda **kwargs: None
+        self._use_temp_config()
+        test_config = DEFAULT_CONFIG.copy()
+        test_config['opacity'] = 0.75
+        test_config['font_size'] = 14
+        test_config['text'] = "Test prompt"
 
-        # Use actual temp file
-        with patch('config_manager.CONFIG_FILE', self.config_file):
-            with patch('config_manager.CONFIG_DIR', Path(self.temp_dir)):
-                test_config = DEFAULT_CONFIG.copy()
-                test_config['opacity'] = 0.75
-                test_config['font_size'] = 14
-                test_config['text'] = "Test prompt"
+        save_config(test_config)
+        loaded = load_config()
+
+        self.assertEqual(loaded['opacity'], 0.75)
+        self.assertEqual(loaded['font_size'], 14)
+        self.assertEqual(loaded['text'], "Test prompt")
+
+    def test_save_config_leaves_no_temp_files(self):
+        """save_config should replace config.json without leaving temp files."""
+        self.config_file.write_text(json.dumps({'opacity': 1.0}))
+
+        self._use_temp_config()
+        save_config({'opacity': 0.75})
+
+        self.assertEqual(os.listdir(self.temp_dir), ['config.json'])
+        self.assertEqual(json.loads(self.config_file.read_text())['opacity'], 0.75)
+
+    def test_save_config_replaces_invalid_colors(self):
+        """save_config should not write malformed colors."""
+        self._use_temp_config()
+        save_config({'font_color': 'red', 'bg_color': '#123456'})
 
-                save_config(test_config)
-                loaded = load_config()
+        saved = json.loads(self.config_file.read_text())
+        self.assertEqual(saved['font_color'], DEFAULT_CONFIG['font_color'])
+        self.assertEqual(saved['bg_color'], '#123456')
 
-                self.assertEqual(loaded['opacity'], 0.75)
-                self.assertEqual(loaded['font_size'], 14)
-                self.assertEqual(loaded['text'], "Test prompt")
+    def test_save_config_fixes_out_of_range_numbers(self):
+        """save_config should clamp numbers and reset non-numeric values."""
+        self._use_temp_config()
+        save_config({'opacity': 2.0, 'font_size': 'huge'})
+
+        saved = json.loads(self.config_file.read_text())
+        self.assertEqual(saved['opacity'], 1.0)
+        self.assertEqual(saved['font_size'], DEFAULT_CONFIG['font_size'])
 
     @patch('config_manager.CONFIG_FILE')
     def test_load_config_merges_with_defaults(self, mock_file):
@@ -112,6 +152,64 @@ class TestConfigManager(unittest.TestCase):
         self.assertEqual(config['font_size'], DEFAULT_CONFIG['font_size'])
         self.assertEqual(config['font_family'], DEFAULT_CONFIG['font_family'])
 
+    def test_load_config_large_file(self):
+        """Configs above the mmap threshold should load like small ones."""
+        big_text = "x" * (128 * 1024)
+        self.config_file.write_text(json.dumps({'text': big_text}))
+
+        with patch('config_manager.CONFIG_FILE', self.config_file):
+            loaded = load_config()
+
+        self.assertEqual(loaded['text'], big_text)
+        self.assertEqual(loaded['opacity'], DEFAULT_CONFIG['opacity'])
+
+    def test_load_config_returns_independent_copies(self):
+        """Cached loads should not leak caller mutations."""
+        self.config_file.write_text(json.dumps({'opacity': 0.5}))
+
+        with patch('config_manager.CONFIG_FILE', self.config_file):
+            first = load_config()
+            first['opacity'] = 0.9
+            second = load_config()
+
+        self.assertEqual(second['opacity'], 0.5)
+
+    def test_load_config_sees_saved_changes(self):
+        """A save should invalidate the cached load."""
+        self._use_temp_config()
+        save_config({'opacity': 0.5})
+        self.assertEqual(load_config()['opacity'], 0.5)
+        save_config({'opacity': 0.6})
+        self.assertEqual(load_config()['opacity'], 0.6)
+
+    def test_load_config_drops_unknown_keys(self):
+        """Keys outside the schema should not be loaded."""
+        self.config_file.write_text(json.dumps({'opacity': 0.6, 'bogus': 1}))
+
+        with patch('config_manager.CONFIG_FILE', self.config_file):
+            loaded = load_config()
+
+        self.assertEqual(loaded['opacity'], 0.6)
+        self.assertNotIn('bogus', loaded)
+
+    def test_load_config_rejects_oversized_file(self):
+        """Files above MAX_CONFIG_BYTES should yield defaults unparsed."""
+        self.config_file.write_text(json.dumps({'text': 'x' * MAX_CONFIG_BYTES}))
+
+        with patch('config_manager.CONFIG_FILE', self.config_file):
+            loaded = load_config()
+
+        self.assertEqual(loaded, DEFAULT_CONFIG)
+
+    def test_load_config_rejects_non_object_json(self):
+        """A JSON array or scalar should yield defaults."""
+        self.config_file.write_text('[1, 2, 3]')
+
+        with patch('config_manager.CONFIG_FILE', self.config_file):
+            loaded = load_config()
+
+        self.assertEqual(loaded, DEFAULT_CONFIG)
+
     @patch('config_manager.CONFIG_FILE')
     def test_load_config_handles_invalid_json(self, mock_file):
         """Loading invalid JSON should return defaults."""
@@ -152,6 +250,21 @@ class TestConfigManager(unittest.TestCase):
         self.assertFalse(result)
 
 
+    def test_get_config_mtime_zero_when_no_file(self):
+        """get_config_mtime should return 0 when no config file exists."""
+        with patch('config_manager.CONFIG_FILE', Path(self.temp_dir) / "nonexistent.json"):
+            self.assertEqual(get_config_mtime(), 0)
+
+    def test_get_config_mtime_matches_file(self):
+        """get_config_mtime should report the config file's mtime."""
+        self.config_file.write_text(json.dumps({'opacity': 0.5}))
+
+        with patch('config_manager.CONFIG_FILE', self.config_file):
+            mtime = get_config_mtime()
+
+        self.assertEqual(mtime, os.stat(self.config_file).st_mtime_ns)
+
+
 class TestConfigSchema(unittest.TestCase):
     """Test config schema consistency."""
 
@@ -173,11 +286,27 @@ class TestConfigSchema(unittest.TestCase):
 
     def test_color_format(self):
         """Colors should be valid hex format."""
-        import re
-        hex_pattern = r'^#[0-9A-Fa-f]{6}$'
-
-        self.assertRegex(DEFAULT_CONFIG['font_color'], hex_pattern)
-        self.assertRegex(DEFAULT_CONFIG['bg_color'], hex_pattern)
+        self.assertRegex(DEFAULT_CONFIG['font_color'], HEX_COLOR_PATTERN)
+        self.assertRegex(DEFAULT_CONFIG['bg_color'], HEX_COLOR_PATTERN)
+
+    def test_default_config_is_read_only(self):
+        """DEFAULT_CONFIG should reject mutation; .copy() gives a dict."""
+        with self.assertRaises(TypeError):
+            DEFAULT_CONFIG['opacity'] = 0.1
+
+        copy = DEFAULT_CONFIG.copy()
+        copy['opacity'] = 0.1
+        self.assertIsInstance(copy, dict)
+        self.assertNotEqual(DEFAULT_CONFIG['opacity'], 0.1)
+
+    def test_is_valid_hex_color(self):
+        """is_valid_hex_color should accept only #RRGGBB strings."""
+        self.assertTrue(is_valid_hex_color('#2d2d2d'))
+        self.assertTrue(is_valid_hex_color('#FFFFFF'))
+        self.assertFalse(is_valid_hex_color('#FFF'))
+        self.assertFalse(is_valid_hex_color('#FFFFFF\n'))
+        self.assertFalse(is_valid_hex_color('white'))
+        self.assertFalse(is_valid_hex_color(None))
 
 
 if __name__ == '__main__':
@@ -26,62 +26,121 @@ Unit tests for ScreenPrompt core functionality.
 Run with: pytest test_core.py -v
 """
 
+import copy
+import ctypes
 import json
 import os
 import sys
 import tempfile
+import types
+from ctypes import wintypes
 from pathlib import Path
 from unittest import mock
 
 import pytest
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # =============================================================================
 # ConfigManager Implementation (to be moved to main module later)
 # =============================================================================
 
+# Built once; get_default_config hands out shallow copies
+_DEFAULT_CONFIG_TEMPLATE = {
+    'opacity': 0.9,
+    'font_size': 24,
+    'font_family': 'Arial',
+    'text_color': '#FFFFFF',
+    'bg_color': '#000000',
+    'window_x': 100,
+    'window_y': 100,
+    'window_width': 400,
+    'window_height': 200,
+    'first_run': True,
+}
+
+
 class ConfigManager:
     """Manages ScreenPrompt configuration storage and retrieval."""
 
-    CONFIG_DIR = Path(os.environ.get('APPDATA', '')) / 'ScreenPrompt'
-    CONFIG_FILE = CONFIG_DIR / 'config.json'
+    # Plain str paths: os.path joins once here, no pathlib objects per call
+    CONFIG_DIR = os.path.join(os.environ.get('APPDATA', ''), 'ScreenPrompt')
+    CONFIG_FILE = os.path.join(CONFIG_DIR, 'config.json')
+
+    # Key set of the default schema, computed once at class definition
+    _DEFAULT_KEYS = frozenset(_DEFAULT_CONFIG_TEMPLATE)
+
+    # ((path, inode, mtime_ns, size), config) of the last parsed config file
+    _cache: tuple | None = None
 
     @staticmethod
     def get_default_config() -> dict:
         """Return default configuration dictionary."""
-        return {
-            'opacity': 0.9,
-            'font_size': 24,
-            'font_family': 'Arial',
-            'text_color': '#FFFFFF',
-            'bg_color': '#000000',
-            'window_x': 100,
-            'window_y': 100,
-            'window_width': 400,
-            'window_height': 200,
-            'first_run': True,
-        }
+        return _DEFAULT_CONFIG_TEMPLATE.copy()
 
     @classmethod
     def load_config(cls) -> dict:
         """Load configuration from file, returning defaults if missing."""
-        default = cls.get_default_config()
-        if not cls.CONFIG_FILE.exists():
-            return default
         try:
-            with open(cls.CONFIG_FILE, 'r', encoding='utf-8') as f:
-                saved = json.load(f)
+            with open(cls.CONFIG_FILE, 'rb') as f:
+                st = os.fstat(f.fileno())
+                key = (cls.CONFIG_FILE, st.st_ino, st.st_mtime_ns, st.st_size)
+                # Unchanged since the last load: skip the read and parse
+                if cls._cache is not None and cls._cache[0] == key:
+                    return dict(cls._cache[1])
+                data = f.read()
+            # Parse the raw UTF-8 bytes; orjson when available
+            saved = orjson.loads(data) if orjson else json.loads(data)
+        except (json.JSONDecodeError, OSError):
+            # Missing (FileNotFoundError) or unreadable/corrupt file
+            return cls.get_default_config()
+
+        # Valid JSON that is not an object (e.g. [] or 1) is not a config
+        if not isinstance(saved, dict):
+            return cls.get_default_config()
+
+        # Complete configs (the normal case) need no merge
+        if cls._DEFAULT_KEYS <= saved.keys():
+            config = saved
+        else:
             # Merge with defaults to handle missing keys
-            return {**default, **saved}
-        except (json.JSONDecodeError, IOError):
-            return default
+            config = cls.get_default_config()
+            config.update(saved)
+        cls._cache = (key, config)
+        return dict(config)
 
     @classmethod
     def save_config(cls, config: dict) -> None:
         """Save configuration to file."""
-        cls.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        with open(cls.CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2)
+        cls._cache = None
+        os.makedirs(cls.CONFIG_DIR, exist_ok=True)
+        # Serialize in memory, then write it out unbuffered
+        if orjson:
+            data = orjson.dumps(config)
+        else:
+            data = json.dumps(config, separators=(',', ':')).encode('utf-8')
+        data = memoryview(data)
+        # Write a sibling temp file and rename it into place (atomic)
+        fd, tmp = tempfile.mkstemp(dir=cls.CONFIG_DIR, prefix='.config-', suffix='.tmp')
+        try:
+            try:
+                # os.write may write less than asked; loop until done
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+            os.replace(tmp, cls.CONFIG_FILE)
+        except BaseException:
+            # Don't let a failed cleanup hide the original error
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
 
 
 # =============================================================================
@@ -97,29 +156,118 @@ WS_EX_LAYERED = 0x00080000
 LWA_ALPHA = 0x02
 
 
-def get_windows_build() -> int:
-    """Get Windows build number. Returns 0 if not on Windows."""
+# ctypes.windll.user32 as last configured by _get_user32
+_bound_user32 = None
+
+
+def _get_user32():
+    """
+    Return ctypes.windll.user32 with the capture-exclusion signatures set.
+
+    argtypes/restype are configured once per library object instead of on
+    every call (HWND/DWORD for SetWindowDisplayAffinity avoid ctypes' default
+    int conversion truncating 64-bit handles). They are only reapplied when
+    ctypes.windll.user32 itself is replaced, as the tests do.
+    """
+    global _bound_user32
+    user32 = ctypes.windll.user32
+    if user32 is not _bound_user32:
+        # Configure function signatures for 64-bit compatibility. LONG_PTR
+        # values are plain integers (c_void_p would return None for 0).
+        user32.GetWindowLongPtrW.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        user32.GetWindowLongPtrW.restype = ctypes.c_ssize_t
+        user32.SetWindowLongPtrW.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_ssize_t]
+        user32.SetWindowLongPtrW.restype = ctypes.c_ssize_t
+        user32.SetLayeredWindowAttributes.argtypes = [
+            ctypes.c_void_p, ctypes.c_uint, ctypes.c_byte, ctypes.c_uint
+        ]
+        user32.SetLayeredWindowAttributes.restype = ctypes.c_int
+        user32.SetWindowDisplayAffinity.argtypes = [wintypes.HWND, wintypes.DWORD]
+        user32.SetWindowDisplayAffinity.restype = wintypes.BOOL
+        _bound_user32 = user32
+    return user32
+
+
+class OSVERSIONINFOEXW(ctypes.Structure):
+    """Version info filled in by ntdll.RtlGetVersion."""
+    _fields_ = [
+        ('dwOSVersionInfoSize', wintypes.DWORD),
+        ('dwMajorVersion', wintypes.DWORD),
+        ('dwMinorVersion', wintypes.DWORD),
+        ('dwBuildNumber', wintypes.DWORD),
+        ('dwPlatformId', wintypes.DWORD),
+        ('szCSDVersion', wintypes.WCHAR * 128),
+        ('wServicePackMajor', wintypes.WORD),
+        ('wServicePackMinor', wintypes.WORD),
+        ('wSuiteMask', wintypes.WORD),
+        ('wProductType', wintypes.BYTE),
+        ('wReserved', wintypes.BYTE),
+    ]
+
+
+def _rtl_get_build_number() -> int:
+    """
+    Read the build number straight from ntdll.RtlGetVersion.
+
+    Unlike platform.version() this needs no string parsing and is not
+    subject to the manifest-based version lie of GetVersionEx.
+    """
+    rtl_get_version = ctypes.WinDLL('ntdll').RtlGetVersion
+    rtl_get_version.argtypes = [ctypes.POINTER(OSVERSIONINFOEXW)]
+    rtl_get_version.restype = wintypes.LONG
+
+    info = OSVERSIONINFOEXW()
+    info.dwOSVersionInfoSize = ctypes.sizeof(info)
+    if rtl_get_version(ctypes.byref(info)) != 0:  # STATUS_SUCCESS
+        return 0
+    return info.dwBuildNumber
+
+
+def _query_windows_build() -> int:
+    """Query the Windows build number. Returns 0 if not on Windows."""
     if sys.platform != 'win32':
         return 0
     try:
-        import platform
-        version = platform.version()
-        # Windows version format: "10.0.19041" -> build 19041
-        parts = version.split('.')
-        if len(parts) >= 3:
-            return int(parts[2])
-    except (ValueError, IndexError):
-        pass
-    return 0
+        return _rtl_get_build_number()
+    except (AttributeError, OSError):
+        return 0
 
 
-def is_capture_exclude_supported() -> bool:
-    """Check if WDA_EXCLUDEFROMCAPTURE is supported (Win10 Build 2004+)."""
+# Build number cannot change during process lifetime - query once at import
+_BUILD_NUMBER = _query_windows_build()
+
+
+def get_windows_build() -> int:
+    """Get Windows build number (queried once at import)."""
+    return _BUILD_NUMBER
+
+
+def patch_windows_build(build: int):
+    """Patch the import-time build number to the given value."""
+    return mock.patch(f'{__name__}._BUILD_NUMBER', build)
+
+
+def _check_capture_exclude_supported() -> bool:
+    """Evaluate WDA_EXCLUDEFROMCAPTURE support (Win10 Build 2004+)."""
     # Windows 10 version 2004 = Build 19041
     return sys.platform == 'win32' and get_windows_build() >= 19041
 
 
-def set_capture_exclude(hwnd: int) -> bool:
+# Pure function of platform + build, so fixed for the process lifetime
+_CAPTURE_EXCLUDE_SUPPORTED = _check_capture_exclude_supported()
+
+
+def patch_capture_exclude_supported(supported: bool):
+    """Patch the import-time capture-exclusion support flag."""
+    return mock.patch(f'{__name__}._CAPTURE_EXCLUDE_SUPPORTED', supported)
+
+
+def is_capture_exclude_supported() -> bool:
+    """Check if WDA_EXCLUDEFROMCAPTURE is supported (evaluated once at import)."""
+    return _CAPTURE_EXCLUDE_SUPPORTED
+
+
+def set_capture_exclude(hwnd: int, *, user32=None) -> bool:
     """
     Set window to be excluded from screen capture.
 
@@ -133,6 +281,7 @@ def set_capture_exclude(hwnd: int) -> bool:
 
     Args:
         hwnd: Window handle
+        user32: user32 library to call (defaults to ctypes.windll.user32)
 
     Returns:
         True if successful, False otherwise
@@ -140,24 +289,13 @@ def set_capture_exclude(hwnd: int) -> bool:
     if not is_capture_exclude_supported():
         return False
     try:
-        import ctypes
-        from ctypes import c_void_p, c_int, c_uint, c_byte
-
-        user32 = ctypes.windll.user32
-
-        # Configure function signatures for 64-bit compatibility
-        user32.GetWindowLongPtrW.argtypes = [c_void_p, c_int]
-        user32.GetWindowLongPtrW.restype = c_void_p
-        user32.SetWindowLongPtrW.argtypes = [c_void_p, c_int, c_void_p]
-        user32.SetWindowLongPtrW.restype = c_void_p
-        user32.SetLayeredWindowAttributes.argtypes = [c_void_p, c_uint, c_byte, c_uint]
-        user32.SetLayeredWindowAttributes.restype = c_int
-        user32.SetWindowDisplayAffinity.argtypes = [c_void_p, c_uint]
-        user32.SetWindowDisplayAffinity.restype = c_int
-
-        # Step 1: Add WS_EX_LAYERED style
+        if user32 is None:
+            user32 = _get_user32()
+
+        # Step 1: Add WS_EX_LAYERED style (skip the write if already set)
         ex_style = user32.GetWindowLongPtrW(hwnd, GWL_EXSTYLE)
-        user32.SetWindowLongPtrW(hwnd, GWL_EXSTYLE, ex_style | WS_EX_LAYERED)
+        if not ex_style & WS_EX_LAYERED:
+            user32.SetWindowLongPtrW(hwnd, GWL_EXSTYLE, ex_style | WS_EX_LAYERED)
 
         # Step 2: Use SetLayeredWindowAttributes (NOT UpdateLayeredWindow)
         # This makes window compatible with SetWindowDisplayAffinity
@@ -185,10 +323,7 @@ def set_capture_exclude_simple(hwnd: int) -> bool:
     if not is_capture_exclude_supported():
         return False
     try:
-        import ctypes
-        user32 = ctypes.windll.user32
-        result = user32.SetWindowDisplayAffinity(hwnd, WDA_EXCLUDEFROMCAPTURE)
-        return result != 0
+        return _get_user32().SetWindowDisplayAffinity(hwnd, WDA_EXCLUDEFROMCAPTURE) != 0
     except (AttributeError, OSError):
         return False
 
@@ -197,6 +332,23 @@ def set_capture_exclude_simple(hwnd: int) -> bool:
 # ConfigManager Tests
 # =============================================================================
 
+@pytest.fixture(scope='session')
+def config_tmpdir(tmp_path_factory):
+    """One directory shared by all ConfigManager file tests (created once)."""
+    return tmp_path_factory.mktemp('screenprompt')
+
+
+@pytest.fixture
+def config_paths(config_tmpdir, monkeypatch):
+    """Point ConfigManager at the shared directory; drop config.json afterwards."""
+    config_file = config_tmpdir / 'config.json'
+    monkeypatch.setattr(ConfigManager, 'CONFIG_DIR', str(config_tmpdir))
+    monkeypatch.setattr(ConfigManager, 'CONFIG_FILE', str(config_file))
+    monkeypatch.setattr(ConfigManager, '_cache', None)
+    yield config_file
+    config_file.unlink(missing_ok=True)
+
+
 class TestConfigManager:
     """Tests for ConfigManager class."""
 
@@ -217,8 +369,8 @@ class TestConfigManager:
             'first_run',
         ]
 
-        for key in required_keys:
-            assert key in config, f"Missing required key: {key}"
+        missing = set(required_keys) - config.keys()
+        assert not missing, f"Missing required keys: {sorted(missing)}"
 
     def test_default_config_values(self):
         """Verify default config values are sensible."""
@@ -241,106 +393,107 @@ class TestConfigManager:
         # First run should be True by default
         assert config['first_run'] is True
 
-    def test_save_and_load_config(self):
+    def test_save_and_load_config(self, config_paths):
         """Roundtrip test: save config then load it back."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Temporarily override config paths
-            original_dir = ConfigManager.CONFIG_DIR
-            original_file = ConfigManager.CONFIG_FILE
+        test_config = {
+            'opacity': 0.75,
+            'font_size': 32,
+            'font_family': 'Consolas',
+            'text_color': '#00FF00',
+            'bg_color': '#333333',
+            'window_x': 200,
+            'window_y': 150,
+            'window_width': 500,
+            'window_height': 300,
+            'first_run': False,
+        }
 
-            try:
-                ConfigManager.CONFIG_DIR = Path(tmpdir)
-                ConfigManager.CONFIG_FILE = Path(tmpdir) / 'config.json'
-
-                test_config = {
-                    'opacity': 0.75,
-                    'font_size': 32,
-                    'font_family': 'Consolas',
-                    'text_color': '#00FF00',
-                    'bg_color': '#333333',
-                    'window_x': 200,
-                    'window_y': 150,
-                    'window_width': 500,
-                    'window_height': 300,
-                    'first_run': False,
-                }
-
-                ConfigManager.save_config(test_config)
-                loaded = ConfigManager.load_config()
-
-                assert loaded == test_config
-            finally:
-                ConfigManager.CONFIG_DIR = original_dir
-                ConfigManager.CONFIG_FILE = original_file
+        ConfigManager.save_config(test_config)
+        loaded = ConfigManager.load_config()
 
-    def test_load_missing_config_returns_default(self):
-        """Loading non-existent config should return defaults."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            original_dir = ConfigManager.CONFIG_DIR
-            original_file = ConfigManager.CONFIG_FILE
+        assert loaded == test_config
 
-            try:
-                ConfigManager.CONFIG_DIR = Path(tmpdir)
-                ConfigManager.CONFIG_FILE = Path(tmpdir) / 'nonexistent.json'
+    def test_save_config_completes_short_writes(self, config_paths):
+        """save_config should keep writing when os.write writes partially."""
+        real_write = os.write
+        config = ConfigManager.get_default_config()
 
-                loaded = ConfigManager.load_config()
-                default = ConfigManager.get_default_config()
+        # Write at most 7 bytes per call
+        with mock.patch('os.write', lambda fd, data: real_write(fd, data[:7])):
+            ConfigManager.save_config(config)
 
-                assert loaded == default
-            finally:
-                ConfigManager.CONFIG_DIR = original_dir
-                ConfigManager.CONFIG_FILE = original_file
+        with open(ConfigManager.CONFIG_FILE, 'rb') as f:
+            assert json.loads(f.read()) == config
 
-    def test_load_corrupt_config_returns_default(self):
-        """Loading corrupted JSON should return defaults."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            original_dir = ConfigManager.CONFIG_DIR
-            original_file = ConfigManager.CONFIG_FILE
+    def test_save_config_cleanup_error_keeps_original(self, config_paths):
+        """A failing temp-file unlink should not mask the write error."""
+        with mock.patch('os.replace', side_effect=PermissionError('replace failed')):
+            with mock.patch('os.unlink', side_effect=OSError('unlink failed')):
+                with pytest.raises(PermissionError, match='replace failed'):
+                    ConfigManager.save_config(ConfigManager.get_default_config())
 
-            try:
-                ConfigManager.CONFIG_DIR = Path(tmpdir)
-                ConfigManager.CONFIG_FILE = Path(tmpdir) / 'config.json'
+        for leftover in config_paths.parent.glob('.config-*.tmp'):
+            leftover.unlink()
 
-                # Write invalid JSON
-                with open(ConfigManager.CONFIG_FILE, 'w') as f:
-                    f.write('{ invalid json }')
+    def test_load_config_reuses_parse_until_file_changes(self, config_paths):
+        """Repeated loads of an unchanged file should not re-parse it."""
+        ConfigManager.save_config({'opacity': 0.6})
 
-                loaded = ConfigManager.load_config()
-                default = ConfigManager.get_default_config()
+        with mock.patch(f'{__name__}.json.loads', wraps=json.loads) as mock_loads:
+            with mock.patch(f'{__name__}.orjson', None):
+                first = ConfigManager.load_config()
+                first['opacity'] = 0.1  # Callers may mutate their copy
+                second = ConfigManager.load_config()
 
-                assert loaded == default
-            finally:
-                ConfigManager.CONFIG_DIR = original_dir
-                ConfigManager.CONFIG_FILE = original_file
+        assert second['opacity'] == 0.6
+        assert mock_loads.call_count == 1
 
-    def test_load_partial_config_merges_with_defaults(self):
-        """Partial config should be merged with defaults."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            original_dir = ConfigManager.CONFIG_DIR
-            original_file = ConfigManager.CONFIG_FILE
+        ConfigManager.save_config({'opacity': 0.7})
+        assert ConfigManager.load_config()['opacity'] == 0.7
 
-            try:
-                ConfigManager.CONFIG_DIR = Path(tmpdir)
-                ConfigManager.CONFIG_FILE = Path(tmpdir) / 'config.json'
+    def test_load_missing_config_returns_default(self, config_paths):
+        """Loading non-existent config should return defaults."""
+        loaded = ConfigManager.load_config()
+        default = ConfigManager.get_default_config()
 
-                # Save only some keys
-                partial_config = {'opacity': 0.6, 'font_size': 18}
-                with open(ConfigManager.CONFIG_FILE, 'w') as f:
-                    json.dump(partial_config, f)
+        assert loaded == default
 
-                loaded = ConfigManager.load_config()
+    def test_load_corrupt_config_returns_default(self, config_paths):
+        """Loading corrupted JSON should return defaults."""
+        # Write invalid JSON
+        with open(ConfigManager.CONFIG_FILE, 'w') as f:
+            f.write('{ invalid json }')
 
-                # Should have the partial values
-                assert loaded['opacity'] == 0.6
-                assert loaded['font_size'] == 18
+        loaded = ConfigManager.load_config()
+        default = ConfigManager.get_default_config()
 
-                # Should have defaults for missing keys
-                default = ConfigManager.get_default_config()
-                assert loaded['text_color'] == default['text_color']
-                assert loaded['first_run'] == default['first_run']
-            finally:
-                ConfigManager.CONFIG_DIR = original_dir
-                ConfigManager.CONFIG_FILE = original_file
+        assert loaded == default
+
+    @pytest.mark.parametrize('content', ['[]', '1', '"text"', 'null'])
+    def test_load_non_object_config_returns_default(self, config_paths, content):
+        """Valid JSON that is not an object should return defaults."""
+        with open(ConfigManager.CONFIG_FILE, 'w') as f:
+            f.write(content)
+
+        assert ConfigManager.load_config() == ConfigManager.get_default_config()
+
+    def test_load_partial_config_merges_with_defaults(self, config_paths):
+        """Partial config should be merged with defaults."""
+        # Save only some keys
+        partial_config = {'opacity': 0.6, 'font_size': 18}
+        with open(ConfigManager.CONFIG_FILE, 'w') as f:
+            json.dump(partial_config, f)
+
+        loaded = ConfigManager.load_config()
+
+        # Should have the partial values
+        assert loaded['opacity'] == 0.6
+        assert loaded['font_size'] == 18
+
+        # Should have defaults for missing keys
+        default = ConfigManager.get_default_config()
+        assert loaded['text_color'] == default['text_color']
+        assert loaded['first_run'] == default['first_run']
 
     def test_config_path_uses_appdata(self):
         """Verify config directory uses %APPDATA%\\ScreenPrompt."""
@@ -358,6 +511,83 @@ class TestConfigManager:
 # WinAPI Tests
 # =============================================================================
 
+class _U32Stub:
+    """
+    Minimal user32 stand-in that records calls as (name, args) tuples.
+
+    Return values come from _ret; a callable entry is called with the
+    arguments instead (e.g. to return different results per call).
+    """
+
+    def __init__(self):
+        self.calls = []
+        self._ret = {
+            'GetWindowLongPtrW': 0,
+            'SetWindowLongPtrW': 1,
+            'SetLayeredWindowAttributes': 1,
+            'SetWindowDisplayAffinity': 1,
+        }
+
+    def __getattr__(self, name):
+        if name not in self._ret:
+            raise AttributeError(name)
+
+        def call(*args):
+            self.calls.append((name, args))
+            ret = self._ret[name]
+            return ret(*args) if callable(ret) else ret
+
+        # Cache so argtypes/restype set by _get_user32 stick to the function
+        setattr(self, name, call)
+        return call
+
+    def calls_to(self, name):
+        """Return the argument tuples of every call to name."""
+        return [args for called, args in self.calls if called == name]
+
+    def assert_called_once(self, name):
+        count = len(self.calls_to(name))
+        assert count == 1, f'{name} called {count} times, expected once'
+
+    def assert_called_once_with(self, name, *args):
+        assert self.calls_to(name) == [args], \
+            f'{name} calls {self.calls_to(name)}, expected [{args}]'
+
+
+def _create_mock_user32_success():
+    """Helper to create a user32 stub with all 3-step calls succeeding."""
+    return _U32Stub()
+
+
+@pytest.fixture
+def win_env():
+    """Report Windows build 19041 for the requesting test only."""
+    patchers = [
+        mock.patch('sys.platform', 'win32'),
+        patch_windows_build(19041),
+        patch_capture_exclude_supported(True),
+    ]
+    for patcher in patchers:
+        patcher.start()
+    yield
+    for patcher in reversed(patchers):
+        patcher.stop()
+
+
+@pytest.fixture
+def user32_mock():
+    """A fresh succeeding user32 stub, passed in as user32=..."""
+    return _create_mock_user32_success()
+
+
+@pytest.fixture
+def windll_user32(user32_mock, monkeypatch):
+    """Also install user32_mock as ctypes.windll.user32 (no user32 parameter)."""
+    monkeypatch.setattr(ctypes, 'windll', types.SimpleNamespace(user32=user32_mock),
+                        raising=False)
+    return user32_mock
+
+
 class TestWinAPIConstants:
     """Tests for WinAPI constants and functions."""
 
@@ -372,146 +602,132 @@ class TestWinAPIConstants:
         assert WS_EX_LAYERED == 0x00080000
         assert LWA_ALPHA == 0x02
 
-    def test_windows_version_check_on_supported(self):
-        """Test version check returns True for Build 19041+."""
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
-                assert is_capture_exclude_supported() is True
-
-            with mock.patch('platform.version', return_value='10.0.22000'):
-                assert is_capture_exclude_supported() is True
-
-    def test_windows_version_check_on_unsupported(self):
-        """Test version check returns False for older builds."""
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.18363'):
-                assert is_capture_exclude_supported() is False
-
-    def test_windows_version_check_non_windows(self):
-        """Test version check returns False on non-Windows."""
-        with mock.patch('sys.platform', 'linux'):
-            assert is_capture_exclude_supported() is False
-
-        with mock.patch('sys.platform', 'darwin'):
+    @pytest.mark.parametrize('platform, build, expected', [
+        ('win32', 19041, True),
+        ('win32', 22000, True),
+        ('win32', 18363, False),  # Older builds lack WDA_EXCLUDEFROMCAPTURE
+        ('linux', 0, False),
+        ('darwin', 0, False),
+    ])
+    def test_windows_version_check(self, monkeypatch, platform, build, expected):
+        """Test version check requires Windows Build 19041+."""
+        monkeypatch.setattr(sys, 'platform', platform)
+        monkeypatch.setattr(f'{__name__}._BUILD_NUMBER', build)
+        assert _check_capture_exclude_supported() is expected
+
+    def test_is_capture_exclude_supported_uses_import_time_value(self):
+        """Test the support check reads the flag computed at import."""
+        with patch_capture_exclude_supported(True):
+            assert is_capture_exclude_supported() is True
+        with patch_capture_exclude_supported(False):
             assert is_capture_exclude_supported() is False
 
-    def test_set_capture_exclude_uses_3_step_process(self):
+    def test_set_capture_exclude_uses_3_step_process(self, win_env, user32_mock):
         """Test that set_capture_exclude uses the 3-step layered window fix."""
-        mock_user32 = mock.MagicMock()
-        mock_user32.GetWindowLongPtrW.return_value = 0x100  # Some existing style
-        mock_user32.SetWindowLongPtrW.return_value = 1
-        mock_user32.SetLayeredWindowAttributes.return_value = 1
-        mock_user32.SetWindowDisplayAffinity.return_value = 1  # Success
-
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
-                with mock.patch('ctypes.windll') as mock_windll:
-                    mock_windll.user32 = mock_user32
+        user32_mock._ret['GetWindowLongPtrW'] = 0x100  # Some existing style
 
-                    test_hwnd = 12345
-                    result = set_capture_exclude(test_hwnd)
+        test_hwnd = 12345
+        result = set_capture_exclude(test_hwnd, user32=user32_mock)
 
-                    # Step 1: Get existing extended style
-                    mock_user32.GetWindowLongPtrW.assert_called_once_with(
-                        test_hwnd, GWL_EXSTYLE
-                    )
+        # Step 1: Get existing extended style
+        user32_mock.assert_called_once_with(
+            'GetWindowLongPtrW', test_hwnd, GWL_EXSTYLE
+        )
 
-                    # Step 1b: Add WS_EX_LAYERED to existing style
-                    mock_user32.SetWindowLongPtrW.assert_called_once_with(
-                        test_hwnd, GWL_EXSTYLE, 0x100 | WS_EX_LAYERED
-                    )
+        # Step 1b: Add WS_EX_LAYERED to existing style
+        user32_mock.assert_called_once_with(
+            'SetWindowLongPtrW', test_hwnd, GWL_EXSTYLE, 0x100 | WS_EX_LAYERED
+        )
 
-                    # Step 2: Apply SetLayeredWindowAttributes (NOT UpdateLayeredWindow)
-                    mock_user32.SetLayeredWindowAttributes.assert_called_once_with(
-                        test_hwnd, 0, 255, LWA_ALPHA
-                    )
+        # Step 2: Apply SetLayeredWindowAttributes (NOT UpdateLayeredWindow)
+        user32_mock.assert_called_once_with(
+            'SetLayeredWindowAttributes', test_hwnd, 0, 255, LWA_ALPHA
+        )
 
-                    # Step 3: Apply capture exclusion
-                    mock_user32.SetWindowDisplayAffinity.assert_called_once_with(
-                        test_hwnd, WDA_EXCLUDEFROMCAPTURE
-                    )
+        # Step 3: Apply capture exclusion
+        user32_mock.assert_called_once_with(
+            'SetWindowDisplayAffinity', test_hwnd, WDA_EXCLUDEFROMCAPTURE
+        )
 
-                    assert result is True
+        assert result is True
 
-    def test_set_capture_exclude_call_order(self):
+    def test_set_capture_exclude_call_order(self, win_env, user32_mock):
         """Test that the 3 steps are called in correct order."""
-        call_order = []
+        set_capture_exclude(12345, user32=user32_mock)
 
-        mock_user32 = mock.MagicMock()
-        mock_user32.GetWindowLongPtrW.side_effect = lambda *args: (call_order.append('GetWindowLongPtrW'), 0)[1]
-        mock_user32.SetWindowLongPtrW.side_effect = lambda *args: (call_order.append('SetWindowLongPtrW'), 1)[1]
-        mock_user32.SetLayeredWindowAttributes.side_effect = lambda *args: (call_order.append('SetLayeredWindowAttributes'), 1)[1]
-        mock_user32.SetWindowDisplayAffinity.side_effect = lambda *args: (call_order.append('SetWindowDisplayAffinity'), 1)[1]
+        # The stub records calls in order (signature setup is not a call)
+        call_order = [name for name, _args in user32_mock.calls]
 
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
-                with mock.patch('ctypes.windll') as mock_windll:
-                    mock_windll.user32 = mock_user32
+        # Verify order: get style -> set style -> layered attrs -> affinity
+        assert call_order == [
+            'GetWindowLongPtrW',
+            'SetWindowLongPtrW',
+            'SetLayeredWindowAttributes',
+            'SetWindowDisplayAffinity'
+        ]
 
-                    set_capture_exclude(12345)
+    def test_set_capture_exclude_keeps_existing_layered_style(self, win_env, user32_mock):
+        """Test an already-layered window skips only the style write."""
+        user32_mock._ret['GetWindowLongPtrW'] = WS_EX_LAYERED
 
-                    # Verify order: get style -> set style -> layered attrs -> affinity
-                    assert call_order == [
-                        'GetWindowLongPtrW',
-                        'SetWindowLongPtrW',
-                        'SetLayeredWindowAttributes',
-                        'SetWindowDisplayAffinity'
-                    ]
+        result = set_capture_exclude(12345, user32=user32_mock)
 
-    def test_set_capture_exclude_returns_false_on_affinity_failure(self):
-        """Test that set_capture_exclude returns False when final API call fails."""
-        mock_user32 = mock.MagicMock()
-        mock_user32.GetWindowLongPtrW.return_value = 0
-        mock_user32.SetWindowLongPtrW.return_value = 1
-        mock_user32.SetLayeredWindowAttributes.return_value = 1
-        mock_user32.SetWindowDisplayAffinity.return_value = 0  # Failure
+        assert user32_mock.calls_to('SetWindowLongPtrW') == []
+        # Still required: the window may be an UpdateLayeredWindow one
+        user32_mock.assert_called_once_with(
+            'SetLayeredWindowAttributes', 12345, 0, 255, LWA_ALPHA
+        )
+        assert result is True
 
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
-                with mock.patch('ctypes.windll') as mock_windll:
-                    mock_windll.user32 = mock_user32
+    def test_set_capture_exclude_returns_false_on_affinity_failure(self, win_env, user32_mock):
+        """Test that set_capture_exclude returns False when final API call fails."""
+        user32_mock._ret['SetWindowDisplayAffinity'] = 0  # Failure
 
-                    result = set_capture_exclude(12345)
+        result = set_capture_exclude(12345, user32=user32_mock)
 
-                    assert result is False
+        assert result is False
 
     def test_set_capture_exclude_unsupported_os(self):
         """Test that set_capture_exclude returns False on unsupported OS."""
-        with mock.patch('sys.platform', 'linux'):
+        with patch_capture_exclude_supported(False):
             result = set_capture_exclude(12345)
             assert result is False
 
-    def test_get_windows_build_parses_version(self):
-        """Test Windows build number parsing."""
+    def test_query_windows_build_reads_rtl_version(self):
+        """Test Windows build number comes from RtlGetVersion."""
         with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
+            with mock.patch(f'{__name__}._rtl_get_build_number', return_value=22621):
+                assert _query_windows_build() == 22621
+
+    def test_get_windows_build_uses_import_time_value(self):
+        """Test RtlGetVersion is not queried again after import."""
+        with mock.patch(f'{__name__}._rtl_get_build_number') as mock_rtl:
+            with patch_windows_build(19041):
+                assert get_windows_build() == 19041
                 assert get_windows_build() == 19041
 
-            with mock.patch('platform.version', return_value='10.0.22621'):
-                assert get_windows_build() == 22621
+        mock_rtl.assert_not_called()
 
-    def test_get_windows_build_non_windows(self):
-        """Test get_windows_build returns 0 on non-Windows."""
+    def test_query_windows_build_handles_missing_ntdll(self):
+        """Test the build query returns 0 when RtlGetVersion is unavailable."""
+        with mock.patch('sys.platform', 'win32'):
+            with mock.patch(f'{__name__}._rtl_get_build_number', side_effect=OSError):
+                assert _query_windows_build() == 0
+
+    def test_query_windows_build_non_windows(self):
+        """Test the build query returns 0 on non-Windows."""
         with mock.patch('sys.platform', 'linux'):
-            assert get_windows_build() == 0
+            assert _query_windows_build() == 0
 
-    def test_set_capture_exclude_simple_deprecated(self):
+    def test_set_capture_exclude_simple_deprecated(self, win_env, windll_user32):
         """Test that simple version still works (for backwards compatibility)."""
-        mock_user32 = mock.MagicMock()
-        mock_user32.SetWindowDisplayAffinity.return_value = 1
-
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
-                with mock.patch('ctypes.windll') as mock_windll:
-                    mock_windll.user32 = mock_user32
+        result = set_capture_exclude_simple(12345)
 
-                    result = set_capture_exclude_simple(12345)
-
-                    # Simple version only calls SetWindowDisplayAffinity
-                    mock_user32.SetWindowDisplayAffinity.assert_called_once_with(
-                        12345, WDA_EXCLUDEFROMCAPTURE
-                    )
-                    assert result is True
+        # Simple version only calls SetWindowDisplayAffinity
+        windll_user32.assert_called_once_with(
+            'SetWindowDisplayAffinity', 12345, WDA_EXCLUDEFROMCAPTURE
+        )
+        assert result is True
 
 
 # =============================================================================
@@ -557,10 +773,8 @@ class SettingsPanel:
 
     def toggle(self) -> None:
         """Toggle panel visibility."""
-        if self._visible:
-            self.hide()
-        else:
-            self.show()
+        # show()/hide() only flip the flag here, so flip it directly
+        self._visible = not self._visible
 
 
 class SettingsDialog:
@@ -596,10 +810,13 @@ class SettingsDialog:
             return getattr(self.parent, 'winfo_id', lambda: 0)()
         return 0
 
-    def apply_capture_exclusion(self) -> bool:
+    def apply_capture_exclusion(self, *, user32=None) -> bool:
         """
         Apply capture exclusion to hide settings dialog from screen capture.
 
+        Args:
+            user32: user32 library to call (defaults to ctypes.windll.user32)
+
         Returns:
             True if successfully applied, False otherwise
         """
@@ -607,7 +824,7 @@ class SettingsDialog:
         if hwnd == 0:
             return False
 
-        result = set_capture_exclude(hwnd)
+        result = set_capture_exclude(hwnd, user32=user32)
         self._capture_excluded = result
         return result
 
@@ -700,79 +917,63 @@ class TestSettingsPanel:
 # SettingsDialog Tests (Legacy - Separate Window)
 # =============================================================================
 
-def _create_mock_user32_success():
-    """Helper to create a mock user32 with all 3-step calls succeeding."""
-    mock_user32 = mock.MagicMock()
-    mock_user32.GetWindowLongPtrW.return_value = 0
-    mock_user32.SetWindowLongPtrW.return_value = 1
-    mock_user32.SetLayeredWindowAttributes.return_value = 1
-    mock_user32.SetWindowDisplayAffinity.return_value = 1
-    return mock_user32
+@pytest.fixture(scope='class')
+def dialog_template():
+    """One SettingsDialog per class; tests take copies via _copy_dialog."""
+    return SettingsDialog(hwnd=0)
+
+
+def _copy_dialog(template: SettingsDialog, hwnd: int) -> SettingsDialog:
+    """Return a fresh-state copy of template bound to hwnd."""
+    dialog = copy.copy(template)
+    dialog._hwnd = hwnd
+    dialog._capture_excluded = False
+    return dialog
 
 
 class TestSettingsDialogCaptureExclusion:
     """Tests for SettingsDialog capture exclusion functionality."""
 
-    def test_settings_dialog_applies_capture_exclusion(self):
+    def test_settings_dialog_applies_capture_exclusion(self, win_env, user32_mock, dialog_template):
         """Test that SettingsDialog applies 3-step capture exclusion."""
-        mock_user32 = _create_mock_user32_success()
-
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
-                with mock.patch('ctypes.windll') as mock_windll:
-                    mock_windll.user32 = mock_user32
-
-                    test_hwnd = 98765
-                    dialog = SettingsDialog(hwnd=test_hwnd)
-                    result = dialog.apply_capture_exclusion()
-
-                    # Verify all 3 steps were called
-                    mock_user32.GetWindowLongPtrW.assert_called_once()
-                    mock_user32.SetWindowLongPtrW.assert_called_once()
-                    mock_user32.SetLayeredWindowAttributes.assert_called_once()
-                    mock_user32.SetWindowDisplayAffinity.assert_called_once_with(
-                        test_hwnd, WDA_EXCLUDEFROMCAPTURE
-                    )
-                    assert result is True
-                    assert dialog.is_capture_excluded() is True
-
-    def test_settings_dialog_tracks_exclusion_state(self):
+        test_hwnd = 98765
+        dialog = _copy_dialog(dialog_template, test_hwnd)
+        result = dialog.apply_capture_exclusion(user32=user32_mock)
+
+        # Verify all 3 steps were called
+        user32_mock.assert_called_once('GetWindowLongPtrW')
+        user32_mock.assert_called_once('SetWindowLongPtrW')
+        user32_mock.assert_called_once('SetLayeredWindowAttributes')
+        user32_mock.assert_called_once_with(
+            'SetWindowDisplayAffinity', test_hwnd, WDA_EXCLUDEFROMCAPTURE
+        )
+        assert result is True
+        assert dialog.is_capture_excluded() is True
+
+    def test_settings_dialog_tracks_exclusion_state(self, win_env, user32_mock, dialog_template):
         """Test that SettingsDialog tracks whether exclusion was applied."""
-        mock_user32 = _create_mock_user32_success()
-
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
-                with mock.patch('ctypes.windll') as mock_windll:
-                    mock_windll.user32 = mock_user32
+        dialog = _copy_dialog(dialog_template, 12345)
 
-                    dialog = SettingsDialog(hwnd=12345)
-
-                    # Before applying
-                    assert dialog.is_capture_excluded() is False
+        # Before applying
+        assert dialog.is_capture_excluded() is False
 
-                    # After applying
-                    dialog.apply_capture_exclusion()
-                    assert dialog.is_capture_excluded() is True
+        # After applying
+        dialog.apply_capture_exclusion(user32=user32_mock)
+        assert dialog.is_capture_excluded() is True
 
-    def test_settings_dialog_handles_api_failure(self):
+    def test_settings_dialog_handles_api_failure(self, win_env, user32_mock, dialog_template):
         """Test that SettingsDialog handles WinAPI failure gracefully."""
-        mock_user32 = _create_mock_user32_success()
-        mock_user32.SetWindowDisplayAffinity.return_value = 0  # Final step fails
+        user32_mock._ret['SetWindowDisplayAffinity'] = 0  # Final step fails
 
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
-                with mock.patch('ctypes.windll') as mock_windll:
-                    mock_windll.user32 = mock_user32
-
-                    dialog = SettingsDialog(hwnd=12345)
-                    result = dialog.apply_capture_exclusion()
+        dialog = _copy_dialog(dialog_template, 12345)
+        result = dialog.apply_capture_exclusion(user32=user32_mock)
 
-                    assert result is False
-                    assert dialog.is_capture_excluded() is False
+        assert result is False
+        assert dialog.is_capture_excluded() is False
 
     def test_settings_dialog_handles_unsupported_os(self):
         """Test that SettingsDialog handles unsupported OS gracefully."""
-        with mock.patch('sys.platform', 'linux'):
+        with patch_capture_exclude_supported(False):
             dialog = SettingsDialog(hwnd=12345)
             result = dialog.apply_capture_exclusion()
 
@@ -795,67 +996,49 @@ class TestSettingsDialogCaptureExclusion:
         assert result is False
         assert dialog.is_capture_excluded() is False
 
-    def test_factory_function_applies_exclusion(self):
+    def test_factory_function_applies_exclusion(self, win_env, windll_user32):
         """Test that create_settings_dialog_with_exclusion applies exclusion."""
-        mock_user32 = _create_mock_user32_success()
-
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
-                with mock.patch('ctypes.windll') as mock_windll:
-                    mock_windll.user32 = mock_user32
+        dialog = create_settings_dialog_with_exclusion(hwnd=55555)
 
-                    dialog = create_settings_dialog_with_exclusion(hwnd=55555)
+        windll_user32.assert_called_once_with(
+            'SetWindowDisplayAffinity', 55555, WDA_EXCLUDEFROMCAPTURE
+        )
+        assert dialog.is_capture_excluded() is True
 
-                    mock_user32.SetWindowDisplayAffinity.assert_called_once_with(
-                        55555, WDA_EXCLUDEFROMCAPTURE
-                    )
-                    assert dialog.is_capture_excluded() is True
-
-    def test_multiple_dialogs_independent_exclusion(self):
+    def test_multiple_dialogs_independent_exclusion(self, win_env, user32_mock, dialog_template):
         """Test that multiple dialogs have independent exclusion state."""
-        mock_user32 = _create_mock_user32_success()
         # First call succeeds, second fails
-        mock_user32.SetWindowDisplayAffinity.side_effect = [1, 0]
+        results = iter([1, 0])
+        user32_mock._ret['SetWindowDisplayAffinity'] = lambda *args: next(results)
 
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
-                with mock.patch('ctypes.windll') as mock_windll:
-                    mock_windll.user32 = mock_user32
+        dialog1 = _copy_dialog(dialog_template, 11111)
+        dialog2 = _copy_dialog(dialog_template, 22222)
 
-                    dialog1 = SettingsDialog(hwnd=11111)
-                    dialog2 = SettingsDialog(hwnd=22222)
+        result1 = dialog1.apply_capture_exclusion(user32=user32_mock)
+        result2 = dialog2.apply_capture_exclusion(user32=user32_mock)
 
-                    result1 = dialog1.apply_capture_exclusion()
-                    result2 = dialog2.apply_capture_exclusion()
+        assert result1 is True
+        assert result2 is False
+        assert dialog1.is_capture_excluded() is True
+        assert dialog2.is_capture_excluded() is False
 
-                    assert result1 is True
-                    assert result2 is False
-                    assert dialog1.is_capture_excluded() is True
-                    assert dialog2.is_capture_excluded() is False
-
-    def test_settings_dialog_no_black_box_uses_layered_attrs(self):
+    def test_settings_dialog_no_black_box_uses_layered_attrs(self, win_env, user32_mock, dialog_template):
         """Test that dialog uses SetLayeredWindowAttributes to avoid black box."""
-        mock_user32 = _create_mock_user32_success()
-        mock_user32.GetWindowLongPtrW.return_value = 0x200  # Some existing style
+        user32_mock._ret['GetWindowLongPtrW'] = 0x200  # Some existing style
 
-        with mock.patch('sys.platform', 'win32'):
-            with mock.patch('platform.version', return_value='10.0.19041'):
-                with mock.patch('ctypes.windll') as mock_windll:
-                    mock_windll.user32 = mock_user32
-
-                    test_hwnd = 77777
-                    dialog = SettingsDialog(hwnd=test_hwnd)
-                    dialog.apply_capture_exclusion()
-
-                    # Verify SetLayeredWindowAttributes was called (key to black box fix)
-                    mock_user32.SetLayeredWindowAttributes.assert_called_once_with(
-                        test_hwnd, 0, 255, LWA_ALPHA
-                    )
-
-                    # Verify WS_EX_LAYERED was added to existing style
-                    mock_user32.SetWindowLongPtrW.assert_called_once_with(
-                        test_hwnd, GWL_EXSTYLE, 0x200 | WS_EX_LAYERED
-                    )
+        test_hwnd = 77777
+        dialog = _copy_dialog(dialog_template, test_hwnd)
+        dialog.apply_capture_exclusion(user32=user32_mock)
+
+        # Verify SetLayeredWindowAttributes was called (key to black box fix)
+        user32_mock.assert_called_once_with(
+            'SetLayeredWindowAttributes', test_hwnd, 0, 255, LWA_ALPHA
+        )
+
+        # Verify WS_EX_LAYERED was added to existing style
+        user32_mock.assert_called_once_with(
+            'SetWindowLongPtrW', test_hwnd, GWL_EXSTYLE, 0x200 | WS_EX_LAYERED
+        )
 
 
 # =============================================================================
@@ -0,0 +1,171 @@
+# MIT License
+# Copyright (c) 2026 ScreenPrompt Contributors
+
+"""
+Unit tests for updater module.
+"""
+
+import http.client
+import os
+import re
+import tempfile
+import threading
+import time
+import unittest
+from email.message import Message
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from updater import UpdateChecker
+
+PAYLOAD = bytes(range(256)) * 64  # 16 KiB
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """Serve PAYLOAD by byte range; ranges after the first trickle out slowly."""
+
+    fail_first_range = False
+
+    def do_GET(self):
+        start, end = map(int, re.match(
+            r'bytes=(\d+)-(\d+)', self.headers['Range']
+        ).groups())
+        if start == 0 and self.fail_first_range:
+            self.send_response(200)  # Range ignored
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        chunk = PAYLOAD[start:end + 1]
+        self.send_response(206)
+        self.send_header('Content-Length', str(len(chunk)))
+        self.end_headers()
+        for i in range(0, len(chunk), 512):
+            if self.fail_first_range:
+                time.sleep(0.2)
+            self.wfile.write(chunk[i:i + 512])
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloadUpdate(unittest.TestCase):
+    """Test download state handling."""
+
+    def test_download_update_without_url_clears_flag(self):
+        """download_update should return None and not stay 'downloading'."""
+        checker = UpdateChecker()
+        checker.download_url = None
+
+        self.assertIsNone(checker.download_update())
+        self.assertFalse(checker.is_downloading)
+
+    def test_download_update_async_without_url_clears_flag(self):
+        """The async path should report None and clear the busy flag."""
+        checker = UpdateChecker()
+        checker.download_url = None
+        done = threading.Event()
+        results = []
+
+        def on_complete(path):
+            results.append(path)
+            done.set()
+
+        checker.download_update_async(on_complete)
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(results, [None])
+        self.assertFalse(checker.is_downloading)
+
+
+def _response(status, **headers):
+    message = Message()
+    for name, value in headers.items():
+        message[name] = value
+    return status, message, b''
+
+
+class TestRequest(unittest.TestCase):
+    """Test the pooled GitHub API request helper."""
+
+    def test_request_follows_redirects(self):
+        """Redirects are followed and the token stays on the original host."""
+        checker = UpdateChecker()
+        responses = [
+            _response(301, Location='/repositories/1/releases/latest'),
+            _response(302, Location='https://example.com/latest'),
+            _response(200),
+        ]
+        with mock.patch.object(checker, '_send', side_effect=responses) as send:
+            status, _, _ = checker._request(
+                'api.github.com', 'GET', '/repos/a/b', {'Authorization': 'Bearer x'}
+            )
+
+        self.assertEqual(status, 200)
+        calls = [c.args for c in send.call_args_list]
+        self.assertEqual(calls[1][:3], ('api.github.com', 'GET', '/repositories/1/releases/latest'))
+        self.assertIn('Authorization', calls[1][3])
+        self.assertEqual(calls[2][:3], ('example.com', 'GET', '/latest'))
+        self.assertNotIn('Authorization', calls[2][3])
+
+    def test_request_limits_redirects(self):
+        """A redirect loop should fail instead of spinning forever."""
+        checker = UpdateChecker()
+        with mock.patch.object(
+            checker, '_send', return_value=_response(302, Location='/loop')
+        ):
+            with self.assertRaises(http.client.HTTPException):
+                checker._request('api.github.com', 'GET', '/', {})
+
+    def test_connections_are_per_thread(self):
+        """Each thread gets its own connection for the same host."""
+        checker = UpdateChecker()
+        main_conn = checker._conn('api.github.com')
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(checker._conn('api.github.com'))
+        )
+        thread.start()
+        thread.join()
+
+        self.assertIs(checker._conn('api.github.com'), main_conn)
+        self.assertIsNot(other[0], main_conn)
+
+
+class TestParallelDownload(unittest.TestCase):
+    """Test byte-range downloads against a local HTTP server."""
+
+    def setUp(self):
+        _RangeHandler.fail_first_range = False
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _RangeHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/setup.exe'
+        temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(temp_dir, 'setup.exe')
+
+    def test_download_parallel_assembles_ranges(self):
+        """All ranges should land at their offsets."""
+        UpdateChecker()._download_parallel(self.url, self.path, len(PAYLOAD))
+
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), PAYLOAD)
+
+    def test_download_parallel_fails_fast(self):
+        """One failed range should not wait for the others to finish."""
+        _RangeHandler.fail_first_range = True
+        started = time.monotonic()
+
+        with self.assertRaises(IOError):
+            UpdateChecker()._download_parallel(self.url, self.path, len(PAYLOAD))
+
+        # The slow ranges would take over a second to complete
+        self.assertLess(time.monotonic() - started, 1.0)
+        for thread in threading.enumerate():
+            if thread.name.startswith('sp-range-'):
+                self.assertTrue(thread.daemon)
+
+
+if __name__ == '__main__':
+    unittest.main()